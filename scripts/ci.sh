@@ -4,4 +4,4 @@
 set -e
 
 pipenv run python -m pylint --exit-zero src/main/python/imschrm/ src/test/python/
-pipenv run python -m unittest discover -s src/test/python/
\ No newline at end of file
+pipenv run python -m unittest discover -s src/test/python/ -t src/test/
\ No newline at end of file
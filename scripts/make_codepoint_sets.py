@@ -40,21 +40,48 @@ TEMPLATE="""#!/usr/bin/env python
 # Version: {version}
 # Date: {date}
 
+import bisect
+
+class CodepointSet:
+  '''Immutable set of codepoints stored as a sorted sequence of `start, end, start, end, ...` boundaries,
+  where each `[start, end)` pair is a range of codepoints that belong to the set.'''
+
+  def __init__(self, boundaries):
+    self.boundaries = boundaries
+
+  def __contains__(self, codepoint):
+    return bisect.bisect_right(self.boundaries, codepoint) % 2 == 1
+
+  def __iter__(self):
+    for i in range(0, len(self.boundaries), 2):
+      yield from range(self.boundaries[i], self.boundaries[i + 1])
+
+  def __len__(self):
+    return sum(self.boundaries[i + 1] - self.boundaries[i] for i in range(0, len(self.boundaries), 2))
+
 # Normalized glyph copy performance factor (GCpy) for Latin, Greek, Cyrillic, Hebrew or Common
-GCPY_12 = set(
-(
-{codepoints_GCPY_12}
-)
-)
+GCPY_12 = CodepointSet((
+{ranges_GCPY_12}
+))
 
 # Text rendering performance factor Ren(Gi) for Han, Katakana, Hiragana, Bopomofo or Hangul scripts
-RENGI_06 = set(
-(
-{codepoints_RENGI_06}
-)
-)
+RENGI_06 = CodepointSet((
+{ranges_RENGI_06}
+))
 """
 
+def format_ranges(codepoints):
+  '''Returns the `start, end,` boundaries of the ranges of consecutive codepoints in `codepoints`, one range per line'''
+  ranges = []
+
+  for codepoint in sorted(codepoints):
+    if len(ranges) > 0 and ranges[-1][1] == codepoint:
+      ranges[-1][1] = codepoint + 1
+    else:
+      ranges.append([codepoint, codepoint + 1])
+
+  return "\n".join(f"{start}, {end}," for start, end in ranges)
+
 SCRIPT_LINE_PATTERN = re.compile(r"(?P<start>[a-fA-F0-9]{4})(?:\.\.(?P<end>[a-fA-F0-9]{4}))?\s+;\s+(?P<script>\w*)")
 
 VERSION_LINE_PATTERN = re.compile(r"^#\s+(.+)$")
@@ -104,8 +131,8 @@ if __name__ == '__main__':
 
     f.write(
       TEMPLATE.format(
-        codepoints_GCPY_12=",\n".join(map(str, gcpy_12)),
-        codepoints_RENGI_06=",\n".join(map(str, rengi_06)),
+        ranges_GCPY_12=format_ranges(gcpy_12),
+        ranges_RENGI_06=format_ranges(rengi_06),
         date=file_date,
         version=file_version
       )
@@ -17,6 +17,7 @@ setup(
     'Source': 'https://github.com/sandflow/imscHRM',
   },
   install_requires = ["ttconv>=1.1.0"],
+  extras_require = {"numpy": ["numpy"]},
   classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
@@ -33,7 +34,11 @@ setup(
   package_dir={'': 'src/main/python'},
   packages=['imschrm'],
   entry_points = {
-        'console_scripts': ['imschrm=imschrm.cli:main'],
+        'console_scripts': [
+          'imschrm=imschrm.cli:main',
+          'imschrm-daemon=imschrm.daemon:daemon_main',
+          'imschrm-client=imschrm.daemon:client_main'
+        ],
   },
   python_requires='>=3.8, <4'
 )
@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Batch HRM engine, which evaluates the ISDs of a whole timeline at once using vectorized operations over arrays
+of integer glyph keys. Requires numpy.'''
+
+__author__ = "agent <agent@local>"
+
+import typing
+from fractions import Fraction
+from numbers import Number
+
+import ttconv.isd
+
+import imschrm.hrm
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+# the batch engine evaluates the glyph keys and fingerprints of `imschrm.hrm` with its constants
+
+# pylint: disable=protected-access
+
+# fields of `imschrm.hrm.ISDStatistics`
+
+STATS_DTYPE = [
+  ("dur", "f8"),
+  ("dur_d", "f8"),
+  ("nbg_total", "i8"),
+  ("clear", "?"),
+  ("dur_t", "f8"),
+  ("ngra_t", "f8"),
+  ("gcpy_count", "i8"),
+  ("gren_count", "i8"),
+  ("is_empty", "?"),
+  ("is_repeated", "?")
+]
+
+class GlyphArrays:
+  '''Glyphs of the non-empty ISDs of a timeline. The glyph keys of the `i`th non-empty ISD, in increasing order, and
+  the number of occurrences of each, are `keys[starts[i]:starts[i + 1]]` and `counts[starts[i]:starts[i + 1]]`.
+  The normalized rendered glyph area of each key is `nrga`, and `first_occurrences` is the position of the first
+  occurrence of each key among the glyphs of all non-empty ISDs, in the order in which they are drawn. The glyphs
+  drawn for the `i`th non-empty ISD are at positions `[occurrence_starts[i], occurrence_starts[i + 1])`, and
+  `copy_durs` is the duration of each glyph drawn if it is copied from a buffer.'''
+
+  def __init__(
+    self,
+    keys: "numpy.ndarray",
+    counts: "numpy.ndarray",
+    nrga: "numpy.ndarray",
+    starts: "numpy.ndarray",
+    first_occurrences: "numpy.ndarray",
+    occurrence_starts: "numpy.ndarray",
+    copy_durs: "numpy.ndarray"
+    ):
+    self.keys = keys
+    self.counts = counts
+    self.nrga = nrga
+    self.starts = starts
+    self.first_occurrences = first_occurrences
+    self.occurrence_starts = occurrence_starts
+    self.copy_durs = copy_durs
+
+  def __len__(self):
+    return len(self.starts) - 1
+
+def _concatenate(arrays: typing.List["numpy.ndarray"], dtype) -> "numpy.ndarray":
+  return numpy.concatenate(arrays) if len(arrays) > 0 else numpy.zeros(0, dtype=dtype)
+
+def _copy_durs(keys: "numpy.ndarray", nrga: "numpy.ndarray") -> "numpy.ndarray":
+  '''Returns the duration of each glyph of `keys`, whose normalized rendered glyph areas are `nrga`, when it is
+  copied from a buffer'''
+
+  classes = imschrm.hrm._codepoint_classes()[keys & imschrm.hrm._CODEPOINT_MASK]
+
+  return nrga / numpy.where(classes & imschrm.hrm._GCPY_12_CLASS, imschrm.hrm._GCPY_BASE, imschrm.hrm._GCPY_OTHER)
+
+def _list_glyphs(hrm: imschrm.hrm.HRM, text_runs: typing.Tuple) -> typing.Tuple["numpy.ndarray", ...]:
+  '''Returns the unique glyph keys of the `(glyph style, text)` tuples of `text_runs`, as interned by `hrm`, in
+  increasing order, the number of occurrences and the position of the first occurrence of each, and the duration
+  of each glyph, in order, when it is copied from a buffer'''
+
+  keys = [
+    numpy.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4").astype(numpy.int64)
+    | (hrm._glyph_style_id(glyph_style) << imschrm.hrm._CODEPOINT_BITS)
+    for glyph_style, text in text_runs
+  ]
+
+  keys = _concatenate(keys, numpy.int64)
+
+  unique_keys, firsts, inverse, counts = numpy.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+
+  style_nrga = numpy.array(hrm.glyph_style_nrga, dtype=numpy.float64)
+
+  return (unique_keys, counts, firsts, _copy_durs(unique_keys, style_nrga[unique_keys >> imschrm.hrm._CODEPOINT_BITS])[inverse])
+
+def _merge_glyphs(region_glyphs: typing.List[typing.Tuple["numpy.ndarray", ...]]) -> typing.Tuple["numpy.ndarray", ...]:
+  '''Returns the glyphs of an ISD, as returned by `_list_glyphs()`, given those of each of its regions in the order in
+  which they are drawn'''
+
+  if len(region_glyphs) == 1:
+    return region_glyphs[0]
+
+  offsets = numpy.cumsum([0] + [len(copy_durs) for _, _, _, copy_durs in region_glyphs[:-1]])
+
+  keys = numpy.concatenate([glyphs[0] for glyphs in region_glyphs])
+
+  counts = numpy.concatenate([glyphs[1] for glyphs in region_glyphs])
+
+  firsts = numpy.concatenate([glyphs[2] + offset for glyphs, offset in zip(region_glyphs, offsets)])
+
+  # the first occurrence of a glyph present in several regions is in the first of these regions
+
+  order = numpy.argsort(keys, kind="stable")
+
+  keys = keys[order]
+
+  groups = numpy.flatnonzero(numpy.concatenate(([True], keys[1:] != keys[:-1])))
+
+  return (
+    keys[groups],
+    numpy.add.reduceat(counts[order], groups) if len(keys) > 0 else counts,
+    firsts[order][groups],
+    numpy.concatenate([glyphs[3] for glyphs in region_glyphs])
+  )
+
+def _extract(
+  isd_iterator: typing.Iterator[typing.Tuple[Fraction, ttconv.isd.ISD]],
+  stats: typing.List[imschrm.hrm.ISDStatistics]
+  ) -> typing.Tuple[typing.List[Number], GlyphArrays]:
+  '''Returns the begin times of the ISDs of `isd_iterator` and the glyphs of the non-empty ISDs, and appends to
+  `stats` the statistics of each ISD that do not depend on its glyphs'''
+
+  # only used to fingerprint the ISDs and intern glyph styles
+
+  hrm = imschrm.hrm.HRM()
+
+  offsets = []
+
+  isd_glyphs = []
+
+  prev_fingerprint = None
+
+  region_glyphs = {}
+
+  for time_offset, isd in isd_iterator:
+
+    isd_stats = imschrm.hrm.ISDStatistics()
+
+    offsets.append(time_offset)
+
+    stats.append(isd_stats)
+
+    fingerprint = hrm._fingerprint(isd)
+
+    isd_stats.is_empty = len(fingerprint) == 0
+
+    if isd_stats.is_empty:
+      continue
+
+    isd_stats.is_repeated = fingerprint == prev_fingerprint
+
+    isd_stats.nbg_total, isd_stats.clear, isd_stats.dur_d = imschrm.hrm._compute_background(fingerprint)
+
+    if not isd_stats.is_repeated:
+
+      # the glyphs of regions that were present in the last non-empty ISD are listed only once
+
+      prev_region_glyphs = region_glyphs
+
+      region_glyphs = {}
+
+      for region_fingerprint in fingerprint:
+        if region_fingerprint not in region_glyphs:
+          glyphs = prev_region_glyphs.get(region_fingerprint)
+          region_glyphs[region_fingerprint] = _list_glyphs(hrm, region_fingerprint[2]) if glyphs is None else glyphs
+
+      glyphs = _merge_glyphs([region_glyphs[region_fingerprint] for region_fingerprint in fingerprint])
+
+      prev_fingerprint = fingerprint
+
+    # the glyphs of a repeated ISD are those of the previous non-empty ISD
+
+    isd_glyphs.append(glyphs)
+
+  starts = numpy.cumsum([0] + [len(glyphs[0]) for glyphs in isd_glyphs])
+
+  occurrence_starts = numpy.cumsum([0] + [len(glyphs[3]) for glyphs in isd_glyphs])
+
+  keys = _concatenate([glyphs[0] for glyphs in isd_glyphs], numpy.int64)
+
+  style_nrga = numpy.array(hrm.glyph_style_nrga, dtype=numpy.float64)
+
+  return (
+    offsets,
+    GlyphArrays(
+      keys,
+      _concatenate([glyphs[1] for glyphs in isd_glyphs], numpy.int64),
+      style_nrga[keys >> imschrm.hrm._CODEPOINT_BITS],
+      starts,
+      _concatenate([glyphs[2] + start for glyphs, start in zip(isd_glyphs, occurrence_starts)], numpy.int64),
+      occurrence_starts,
+      _concatenate([glyphs[3] for glyphs in isd_glyphs], numpy.float64)
+    )
+  )
+
+def _in_previous(glyphs: GlyphArrays, segments: "numpy.ndarray") -> "numpy.ndarray":
+  '''Returns whether each glyph of each non-empty ISD is also a glyph of the previous non-empty ISD, i.e. is in the
+  back buffer. `segments` is the index of the non-empty ISD of each glyph.'''
+
+  if len(glyphs.keys) == 0:
+    return numpy.zeros(0, dtype=bool)
+
+  key_bits = int(glyphs.keys.max()).bit_length()
+
+  if key_bits + len(glyphs).bit_length() < 63:
+
+    # each glyph is identified by its key and its ISD, and compared to the glyphs of the previous ISD, which are
+    # assigned to the following ISD
+
+    glyph_ids = (segments << key_bits) | glyphs.keys
+
+    return numpy.isin(glyph_ids, ((segments + 1) << key_bits) | glyphs.keys, assume_unique=True)
+
+  in_previous = numpy.zeros(len(glyphs.keys), dtype=bool)
+
+  for i in range(1, len(glyphs)):
+    begin, end = glyphs.starts[i], glyphs.starts[i + 1]
+    in_previous[begin:end] = numpy.isin(glyphs.keys[begin:end], glyphs.keys[glyphs.starts[i - 1]:begin], assume_unique=True)
+
+  return in_previous
+
+def _sum_in_order(values: "numpy.ndarray", lengths: "numpy.ndarray") -> "numpy.ndarray":
+  '''Returns the sum of each of the consecutive segments of `values` whose lengths are `lengths`. The values of each
+  segment are added one at a time, in order, as by `imschrm.hrm.HRM.next_isd()`, so that the sums are rounded
+  identically.'''
+
+  sums = numpy.zeros(len(lengths), dtype=numpy.float64)
+
+  if len(values) == 0:
+    return sums
+
+  starts = numpy.cumsum(lengths) - lengths
+
+  # the values at the same position within their segment are added to all the segments that are long enough at
+  # once, and segments are sorted by decreasing length so that these segments come first
+
+  order = numpy.argsort(-lengths, kind="stable")
+
+  starts = starts[order]
+
+  active_counts = len(lengths) - numpy.searchsorted(lengths[order][::-1], numpy.arange(lengths.max()), side="right")
+
+  for position, active_count in enumerate(active_counts):
+    sums[order[:active_count]] += values[starts[:active_count] + position]
+
+  return sums
+
+def evaluate_isds(
+  isd_iterator: typing.Iterator[typing.Tuple[Fraction, ttconv.isd.ISD]]
+  ) -> typing.Tuple[typing.List[Number], "numpy.ndarray"]:
+  '''Returns the begin times of the ISDs returned by `isd_iterator` and a structured array, with dtype `STATS_DTYPE`,
+  of their HRM statistics, which are identical to those computed by `imschrm.hrm.HRM.next_isd()`'''
+
+  if numpy is None:
+    raise RuntimeError("The batch HRM engine requires numpy")
+
+  stats = []
+
+  offsets, glyphs = _extract(isd_iterator, stats)
+
+  segments = numpy.repeat(numpy.arange(len(glyphs), dtype=numpy.int64), numpy.diff(glyphs.starts))
+
+  in_previous = _in_previous(glyphs, segments)
+
+  # the first occurrence of a glyph is copied from the back buffer if present there and rendered
+  # otherwise, and any subsequent occurrence is copied from the front buffer
+
+  classes = imschrm.hrm._codepoint_classes()[glyphs.keys & imschrm.hrm._CODEPOINT_MASK]
+
+  ren_g = numpy.where(classes & imschrm.hrm._RENGI_06_CLASS, imschrm.hrm._REN_G_CJK, imschrm.hrm._REN_G_OTHER)
+
+  rendered = ~in_previous
+
+  glyph_durs = glyphs.copy_durs.copy()
+
+  glyph_durs[glyphs.first_occurrences[rendered]] = glyphs.nrga[rendered] / ren_g[rendered]
+
+  glyph_gcpy_count = numpy.where(in_previous, glyphs.counts, glyphs.counts - 1)
+
+  result = numpy.zeros(len(stats), dtype=STATS_DTYPE)
+
+  for name in ("nbg_total", "clear", "dur_d", "is_empty", "is_repeated"):
+    result[name] = [getattr(isd_stats, name) for isd_stats in stats]
+
+  non_empty = ~result["is_empty"]
+
+  # the durations of the glyphs are summed in the order in which they are drawn, and their areas in the order of
+  # their first occurrences
+
+  first_order = numpy.argsort(glyphs.first_occurrences, kind="stable")
+
+  result["dur_t"][non_empty] = _sum_in_order(glyph_durs, numpy.diff(glyphs.occurrence_starts))
+  result["ngra_t"][non_empty] = _sum_in_order(glyphs.nrga[first_order], numpy.diff(glyphs.starts))
+  result["gcpy_count"][non_empty] = numpy.bincount(segments, weights=glyph_gcpy_count, minlength=len(glyphs))
+  result["gren_count"][non_empty] = numpy.bincount(segments, weights=rendered, minlength=len(glyphs))
+  result["dur"] = result["dur_t"] + result["dur_d"]
+
+  return (offsets, result)
+
+def iter_stats(offsets: typing.List[Number], stats: "numpy.ndarray") -> typing.Iterator[typing.Tuple[Number, imschrm.hrm.ISDStatistics]]:
+  '''Returns the `(begin, ISD statistics)` tuples of the ISDs evaluated by `evaluate_isds()`'''
+
+  for time_offset, row in zip(offsets, stats.tolist()):
+    yield (time_offset, imschrm.hrm.ISDStatistics(*row))
+
+def validate(
+  isd_iterator: typing.Iterator[typing.Tuple[Fraction, ttconv.isd.ISD]],
+  event_handler: imschrm.hrm.EventHandler = imschrm.hrm.EventHandler(),
+  tolerance: float = 0
+  ):
+  '''Determines whether the sequence of ISDs returned by `isd_iterator` conform to the IMSC HRM, like
+  `imschrm.hrm.validate()`, using the batch HRM engine, with identical results. All ISDs are evaluated before any
+  event is signalled.'''
+
+  imschrm.hrm.validate_stats(iter_stats(*evaluate_isds(isd_iterator)), event_handler, tolerance)
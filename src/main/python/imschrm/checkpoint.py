@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+'''Validation of a sequence of documents that periodically saves its progress to a checkpoint, from which an
+interrupted validation can be resumed'''
+
+__author__ = "agent <agent@local>"
+
+import io
+import mmap
+import os
+import pickle
+import tempfile
+import time
+import typing
+from dataclasses import dataclass
+from fractions import Fraction
+from numbers import Number
+
+import imschrm.doc_sequence
+import imschrm.hrm
+
+_CHECKPOINT_FORMAT_VERSION = 1
+
+@dataclass
+class Checkpoint:
+  '''State of a validation immediately before an ISD of the document at `doc_position` in the sequence'''
+
+  doc_position: int = 0 # Number of documents that precede the current document
+  doc_key: typing.Optional[bytes] = None # Key of the current document, see `_doc_key()`
+  resume_time: typing.Optional[Fraction] = None # Begin time of the next ISD of the current document, or None before its first ISD
+  sig_time_position: int = 0 # Position of the significant time of the next ISD among those of the current document
+  prev_end_time: typing.Optional[Number] = None # Time at which the last ISD of the preceding document ends
+  hrm_state: typing.Optional[typing.Tuple] = None # State of the HRM, see `imschrm.hrm.HRM.restore()`
+  last_render_time: Number = -imschrm.hrm._IPD # Begin time of the last non-empty ISD
+  isd_index: int = 0 # Index of the next ISD
+  error_count: int = 0 # Number of errors signalled so far
+
+def _versions(interval_tolerance: Number) -> str:
+  return (
+    f"{_CHECKPOINT_FORMAT_VERSION} "
+    f"{imschrm.doc_sequence._package_version('ttconv')} "
+    f"{imschrm.doc_sequence._source_version()} "
+    f"{Fraction(interval_tolerance)}"
+  )
+
+def save_checkpoint(path: str, checkpoint: Checkpoint, interval_tolerance: Number = 0):
+  '''Writes `checkpoint` to the file at `path`, replacing any existing checkpoint atomically'''
+
+  with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)), delete=False) as f:
+    try:
+      pickle.dump((_versions(interval_tolerance), checkpoint), f, pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+      f.close()
+      os.remove(f.name)
+      raise
+
+  os.replace(f.name, path)
+
+def load_checkpoint(path: str, interval_tolerance: Number = 0) -> typing.Optional[Checkpoint]:
+  '''Reads the checkpoint at `path`, and returns `None` if it does not exist or was created by other versions
+  of the software or with another `interval_tolerance`. Checkpoints are unpickled and must therefore be trusted.'''
+
+  try:
+    with open(path, "rb") as f:
+      versions, checkpoint = pickle.load(f)
+  except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+    return None
+
+  if versions != _versions(interval_tolerance):
+    return None
+
+  return checkpoint
+
+def _doc_key(ttml_doc) -> typing.Tuple[bytes, typing.Any]:
+  '''Returns a key that identifies the document `ttml_doc`, and the document. Documents backed by a file are
+  identified by the name, size and modification time of the file, which is parsed as it is read, and other documents
+  by a hash of their contents. Streams that are neither files nor in-memory buffers are read in the process, and
+  their contents are returned in their place.'''
+
+  if isinstance(ttml_doc, (str, bytes, bytearray, memoryview, mmap.mmap)):
+    return (imschrm.doc_sequence._document_key(ttml_doc), ttml_doc)
+
+  try:
+    st = os.fstat(ttml_doc.fileno())
+  except (AttributeError, OSError, io.UnsupportedOperation):
+    pass
+  else:
+    file_id = f"{getattr(ttml_doc, 'name', '')} {st.st_size} {st.st_mtime_ns}"
+
+    return (imschrm.doc_sequence._document_key(file_id), ttml_doc)
+
+  if isinstance(ttml_doc, (io.BytesIO, io.StringIO)):
+    return (imschrm.doc_sequence._document_key(ttml_doc.getvalue()), ttml_doc)
+
+  ttml_doc = ttml_doc.read()
+
+  return (imschrm.doc_sequence._document_key(ttml_doc), ttml_doc)
+
+class _ErrorCounter(imschrm.hrm.EventHandler):
+  '''Forwards events to `event_handler` and counts errors'''
+
+  def __init__(self, event_handler: imschrm.hrm.EventHandler, error_count: int):
+    self.event_handler = event_handler
+    self.error_count = error_count
+
+  def info(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.event_handler.info(msg, doc_index, time_offset, available_time, stats)
+
+  def warn(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.event_handler.warn(msg, doc_index, time_offset, available_time, stats)
+
+  def error(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.error_count += 1
+    self.event_handler.error(msg, doc_index, time_offset, available_time, stats)
+
+  def debug(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.event_handler.debug(msg, doc_index, time_offset, available_time, stats)
+
+class _CheckpointWriter:
+
+  def __init__(self, path: str, interval: Number, interval_tolerance: Number, checkpoint: Checkpoint, errors: _ErrorCounter):
+    self.path = path
+    self.interval = interval
+    self.interval_tolerance = interval_tolerance
+    self.checkpoint = checkpoint
+    self.errors = errors
+    self.last_write = time.monotonic()
+
+  def update(self, hrm: imschrm.hrm.HRM, **kwargs):
+    '''Updates the checkpoint with the state of the validation immediately before the next ISD, and writes it if
+    `interval` seconds have passed since it was last written'''
+
+    for name, value in kwargs.items():
+      setattr(self.checkpoint, name, value)
+
+    if time.monotonic() - self.last_write >= self.interval:
+      self.checkpoint.hrm_state = hrm.fingerprint
+      self.checkpoint.error_count = self.errors.error_count
+      save_checkpoint(self.path, self.checkpoint, self.interval_tolerance)
+      self.last_write = time.monotonic()
+
+def iter_stats(
+  doc_iterator: imschrm.doc_sequence.DocumentIterator,
+  start: Checkpoint,
+  writer: _CheckpointWriter,
+  interval_tolerance: Number = 0
+  ):
+  '''Returns the same sequence of ISD statistics as `imschrm.hrm._iter_stats(imschrm.doc_sequence.iter_isd(doc_iterator))`,
+  starting at checkpoint `start`, and returns the time at which the last ISD ends, or `None` if the sequence ended
+  with a document that does not end. `writer.update(hrm, **fields)` is called with the HRM and the fields of the
+  checkpoint that change before each document and each ISD.'''
+
+  hrm = imschrm.hrm.HRM()
+
+  hrm.restore(start.hrm_state)
+
+  cur_time = start.prev_end_time
+
+  last_render_time = start.last_render_time
+
+  isd_index = start.isd_index
+
+  for doc_position, (doc_begin, doc_end, ttml_doc) in enumerate(doc_iterator):
+
+    # the documents that precede the checkpoint are skipped without being parsed
+
+    if doc_position < start.doc_position:
+      continue
+
+    doc_key, ttml_doc = _doc_key(ttml_doc)
+
+    if doc_position == start.doc_position and start.doc_key is not None and doc_key != start.doc_key:
+      raise RuntimeError("The document sequence does not match the checkpoint")
+
+    if doc_position == start.doc_position and start.resume_time is not None:
+
+      # continue the document from the checkpoint
+
+      isd_begin = start.resume_time
+
+      start_position = start.sig_time_position
+
+    else:
+
+      start_position = None
+
+      writer.update(
+        hrm,
+        doc_position=doc_position,
+        doc_key=doc_key,
+        resume_time=None,
+        prev_end_time=cur_time,
+        last_render_time=last_render_time,
+        isd_index=isd_index
+      )
+
+      isd_begin = doc_begin
+
+      if cur_time is not None:
+
+        if cur_time - doc_begin > interval_tolerance:
+
+          raise RuntimeError("Time intervals are overlapping.")
+
+        if doc_begin - cur_time > interval_tolerance:
+
+          # insert a null ISD if there is a gap between documents
+
+          yield (cur_time, hrm.next_isd(None))
+
+          isd_index += 1
+
+    isd_iterator = imschrm.doc_sequence._iter_doc_isd(
+      isd_begin,
+      doc_end,
+      ttml_doc,
+      interval_tolerance,
+      start_position=start_position,
+      with_positions=True
+    )
+
+    while True:
+
+      try:
+        time_offset, sig_time_position, isd = next(isd_iterator)
+      except StopIteration as e:
+        cur_time = e.value
+        break
+
+      writer.update(
+        hrm,
+        resume_time=time_offset,
+        sig_time_position=sig_time_position,
+        last_render_time=last_render_time,
+        isd_index=isd_index
+      )
+
+      stats = hrm.next_isd(isd)
+
+      yield (time_offset, stats)
+
+      isd_index += 1
+
+      if not stats.is_empty:
+        last_render_time = time_offset
+
+    if cur_time is None:
+      return None
+
+  return cur_time
+
+def validate_resumable(
+  doc_iterator: imschrm.doc_sequence.DocumentIterator,
+  checkpoint_path: str,
+  event_handler: imschrm.hrm.EventHandler = imschrm.hrm.EventHandler(),
+  tolerance: float = 0,
+  interval_tolerance: Number = 0,
+  checkpoint_interval: Number = 5,
+  resume: bool = False
+  ) -> int:
+  '''Validates the sequence of documents returned by `doc_iterator`, like
+  `imschrm.hrm.validate(imschrm.doc_sequence.iter_isd(doc_iterator, interval_tolerance), event_handler, tolerance)`,
+  and saves a checkpoint at `checkpoint_path` at most every `checkpoint_interval` seconds. If `resume` is `True`
+  and a checkpoint exists at `checkpoint_path`, the validation continues from the checkpoint, and the events that
+  precede it are not signalled again. The checkpoint is removed once the validation completes. Returns the number
+  of errors signalled, including those signalled before the checkpoint.
+  '''
+
+  start = load_checkpoint(checkpoint_path, interval_tolerance) if resume else None
+
+  if start is None:
+    start = Checkpoint()
+
+  errors = _ErrorCounter(event_handler, start.error_count)
+
+  writer = _CheckpointWriter(checkpoint_path, checkpoint_interval, interval_tolerance, Checkpoint(**vars(start)), errors)
+
+  imschrm.hrm.validate_stats(
+    iter_stats(doc_iterator, start, writer, interval_tolerance),
+    errors,
+    tolerance,
+    start.last_render_time,
+    start.isd_index
+  )
+
+  if os.path.exists(checkpoint_path):
+    os.remove(checkpoint_path)
+
+  return errors.error_count
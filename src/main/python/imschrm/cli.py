@@ -29,13 +29,22 @@ __author__ = "Pierre-Anthony Lemieux <pal@palemieux.com>"
 
 import argparse
 import sys
+import typing
+import itertools
 import logging
 from fractions import Fraction
+import os
 import os.path
 import json
+import concurrent.futures
+import collections
 
 import imschrm.hrm
+import imschrm.checkpoint
 import imschrm.doc_sequence
+import imschrm.incremental
+import imschrm.result_cache
+import imschrm.shard
 
 LOGGER = logging.getLogger("hrm-validator")
 
@@ -43,24 +52,135 @@ class EventHandler(imschrm.hrm.EventHandler):
 
   def __init__(self):
     self.failed = False
+    self.isd_count = 0
+    self.repeated_isd_count = 0
+
+  def debug(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    if not stats.is_empty:
+      self.isd_count += 1
+      self.repeated_isd_count += 1 if stats.is_repeated else 0
+    super().debug(msg, doc_index, time_offset, available_time, stats)
 
   def error(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
     self.failed = True
     super().error(msg, doc_index, time_offset, available_time, stats)
 
 
+class BatchEventHandler(imschrm.hrm.EventHandler):
+  '''Records error and warning messages so that they can be reported once the input has been validated'''
+
+  def __init__(self):
+    self.failed = False
+    self.messages = []
+
+  def warn(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.messages.append("WARNING: " + imschrm.hrm.EventHandler._format_message(msg, doc_index, time_offset, available_time, stats))
+
+  def error(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.failed = True
+    self.messages.append("ERROR: " + imschrm.hrm.EventHandler._format_message(msg, doc_index, time_offset, available_time, stats))
+
+  def debug(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    pass
+
+
+class ManifestError(ValueError):
+  '''Raised when an entry of a manifest cannot be read, or when a manifest has no entries'''
+
+
 class LocalFileSequence:
+  '''Sequence of documents listed in a manifest, which is either a JSON array of entries or a JSON Lines
+  file with one entry per line. The latter is read lazily, one entry at a time. If `prefetch` is greater
+  than 0, up to `prefetch` documents are read ahead of time by a pool of threads.'''
+
+  def __init__(self, manifest_path, prefetch: int = 0):
+    self.manifest_path = manifest_path
 
-  def __init__(self, manifest_path):
-    with open(manifest_path) as f: 
-      self.manifest = json.load(f)
+    self.prefetch = prefetch
 
     self.root_path = os.path.dirname(manifest_path)
 
+    with open(manifest_path, encoding="utf-8") as f:
+      if _is_json_array(f):
+        f.seek(0)
+        self.manifest = json.load(f)
+      else:
+        self.manifest = None
+
+  def _iter_manifest(self):
+    if self.manifest is not None:
+      if len(self.manifest) == 0:
+        raise ManifestError(f"{self.manifest_path}: the manifest has no entries")
+
+      yield from self.manifest
+      return
+
+    entry_count = 0
+
+    with open(self.manifest_path, encoding="utf-8") as f:
+      for line_number, line in enumerate(f, 1):
+        if not line.strip():
+          continue
+
+        try:
+          entry = json.loads(line)
+        except json.JSONDecodeError as e:
+          # typically a manifest whose last line is still being written
+          raise ManifestError(f"{self.manifest_path}, line {line_number}: invalid or incomplete entry ({e})") from None
+
+        entry_count += 1
+
+        yield entry
+
+    # e.g. an empty file, which would otherwise pass validation
+
+    if entry_count == 0:
+      raise ManifestError(f"{self.manifest_path}: the manifest has no entries")
+
+  def _document_path(self, document):
+    return os.path.join(self.root_path, document["path"])
+
+  def document_paths(self) -> typing.Iterator[str]:
+    '''Returns the paths of the documents listed in the manifest, in order, without reading the documents'''
+    return map(self._document_path, self._iter_manifest())
+
+  def _read_document(self, document):
+    with open(self._document_path(document), "rb") as f:
+      return f.read()
+
+  @staticmethod
+  def _make_entry(document, ttml_doc):
+    return (Fraction(document["begin"]), None if document["end"] is None else Fraction(document["end"]), ttml_doc)
+
   def __iter__(self):
-    for document in self.manifest:
-      with open(os.path.join(self.root_path, document["path"])) as f:
-        yield (Fraction(document["begin"]), None if document["end"] is None else Fraction(document["end"]), f.read())
+    if self.prefetch <= 0:
+      for document in self._iter_manifest():
+        yield LocalFileSequence._make_entry(document, self._read_document(document))
+      return
+
+    pending = collections.deque()
+
+    with concurrent.futures.ThreadPoolExecutor(self.prefetch) as executor:
+
+      for document in self._iter_manifest():
+
+        pending.append((document, executor.submit(self._read_document, document)))
+
+        if len(pending) > self.prefetch:
+          document, future = pending.popleft()
+          yield LocalFileSequence._make_entry(document, future.result())
+
+      while len(pending) > 0:
+        document, future = pending.popleft()
+        yield LocalFileSequence._make_entry(document, future.result())
+
+def _is_json_array(f: typing.TextIO) -> bool:
+  '''Returns whether the first non-whitespace character of `f` starts a JSON array'''
+  while True:
+    c = f.read(1)
+
+    if not c.isspace():
+      return c == "["
 
 
 class SingleLocalFile:
@@ -68,38 +188,336 @@ class SingleLocalFile:
     self.path = path
 
   def __iter__(self):
-    with open(self.path, "r", encoding="utf-8") as f:
-      yield (0, None, f.read())
+    # the document is parsed directly from the file
+    with open(self.path, "rb") as f:
+      yield (0, None, f)
       
 
-def main(argv=None):
-  '''Main application processing'''
+def _make_doc_sequence(path: str, itype: str, prefetch: int = 0):
+  if itype is None or itype == "ttml":
+    return SingleLocalFile(path)
+
+  return LocalFileSequence(path, prefetch)
+
+def _input_key(path: str, itype: str, result_cache: imschrm.result_cache.ResultCache, prefetch: int = 0) -> bytes:
+  '''Returns the key of the input at `path` in `result_cache`, which depends on the contents of its documents only
+  if `result_cache.hash_contents` is true, since they are otherwise read twice'''
+
+  if result_cache.hash_contents:
+    return imschrm.result_cache.ResultCache.input_key(_make_doc_sequence(path, itype, prefetch), 0)
+
+  if itype is None or itype == "ttml":
+    return imschrm.result_cache.ResultCache.file_key([path], 0)
+
+  return imschrm.result_cache.ResultCache.file_key(
+    itertools.chain([path], LocalFileSequence(path).document_paths()),
+    0
+  )
+
+def _expand_inputs(paths: typing.Iterable[str], itype: str) -> typing.List[str]:
+  '''Replaces each directory in `paths` by the input files it contains, recursively and in sorted order. Raises
+  `ValueError` if a directory contains no input file.'''
+
+  exts = (".json", ".jsonl", ".ndjson") if itype == "manifest" else (".ttml",)
+
+  inputs = []
+
+  for path in paths:
+    if not os.path.isdir(path):
+      inputs.append(path)
+      continue
+
+    input_count = len(inputs)
+
+    for root, subdirs, files in os.walk(path):
+      subdirs.sort()
+      inputs.extend(os.path.join(root, filename) for filename in sorted(files) if os.path.splitext(filename)[1] in exts)
+
+    if len(inputs) == input_count:
+      raise ValueError(f"No input file ({', '.join(exts)}) found in {path}")
+
+  return inputs
+
+def _validate(
+  path: str,
+  itype: str,
+  event_handler: imschrm.hrm.EventHandler,
+  max_workers: int = 1,
+  prefetch: int = 0,
+  model_cache: typing.Optional[imschrm.doc_sequence.ModelCache] = None,
+  isd_cache: typing.Optional[imschrm.doc_sequence.ISDCache] = None,
+  result_cache: typing.Optional[imschrm.result_cache.ResultCache] = None,
+  record_path: typing.Optional[str] = None
+  ):
+  '''Validates the input at `path`, or replays the events recorded in `result_cache` if the input is unchanged. If
+  `record_path` is provided, the input is validated incrementally against the validation record at `record_path`,
+  which is then replaced by the record of this validation.'''
+
+  if result_cache is not None:
+    key = _input_key(path, itype, result_cache, prefetch)
+
+    events = result_cache.load(key)
+
+    if events is not None:
+      imschrm.result_cache.replay(events, event_handler)
+      return
+
+    event_handler = imschrm.result_cache.RecordingEventHandler(event_handler)
+
+  doc_sequence = _make_doc_sequence(path, itype, prefetch)
+
+  if record_path is not None:
+    previous = imschrm.incremental.ValidationRecord.load(record_path)
+
+    imschrm.incremental.validate_incremental(doc_sequence, previous, event_handler, 0).save(record_path)
+
+  elif itype == "ttml" and max_workers > 1 and isd_cache is None:
+
+    # a single document is split into time shards that are validated in parallel
+
+    with open(path, "rb") as f:
+      imschrm.shard.validate_time_sharded(f, event_handler, 0, max_workers)
+
+  else:
+    imschrm.hrm.validate(
+      imschrm.doc_sequence.iter_isd(doc_sequence, 0, max_workers, model_cache, isd_cache),
+      event_handler,
+      0,
+      max_workers
+    )
+
+  if result_cache is not None:
+    result_cache.store(key, event_handler.events)
+
+def _validate_input(
+  path: str,
+  itype: str,
+  prefetch: int = 0,
+  model_cache_size: int = 0,
+  isd_cache_dir: typing.Optional[str] = None,
+  cache_dir: typing.Optional[str] = None,
+  cache_hash_contents: bool = False
+  ) -> typing.Tuple[bool, typing.List[str], typing.Tuple[int, int]]:
+  '''Validates the input at `path` and returns whether validation failed, any error and warning messages, and
+  the number of hits and misses of the result cache'''
+
+  ev = BatchEventHandler()
+
+  model_cache = imschrm.doc_sequence.ModelCache(model_cache_size) if model_cache_size > 0 else None
+
+  result_cache = None
+
+  try:
+    isd_cache = imschrm.doc_sequence.ISDCache(isd_cache_dir) if isd_cache_dir is not None else None
+
+    result_cache = imschrm.result_cache.ResultCache(cache_dir, cache_hash_contents) if cache_dir is not None else None
+
+    _validate(path, itype, ev, 1, prefetch, model_cache, isd_cache, result_cache)
+  except Exception as e: # pylint: disable=broad-except
+    ev.failed = True
+    ev.messages.append(f"ERROR: {e}\n")
+
+  return (ev.failed, ev.messages, (0, 0) if result_cache is None else (result_cache.hits, result_cache.misses))
+
+def _validate_inputs(
+  inputs: typing.List[str],
+  itype: str,
+  max_workers: int,
+  prefetch: int,
+  model_cache_size: int,
+  isd_cache_dir: typing.Optional[str],
+  cache_dir: typing.Optional[str],
+  cache_hash_contents: bool = False
+  ) -> bool:
+  '''Validates `inputs` in a pool of `max_workers` processes, reports the result of each input in order,
+  and returns whether any validation failed'''
+
+  failed_count = 0
+
+  cache_hits = 0
+
+  cache_misses = 0
+
+  with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+
+    results = executor.map(
+      _validate_input,
+      inputs,
+      itertools.repeat(itype),
+      itertools.repeat(prefetch),
+      itertools.repeat(model_cache_size),
+      itertools.repeat(isd_cache_dir),
+      itertools.repeat(cache_dir),
+      itertools.repeat(cache_hash_contents)
+    )
+
+    for path, (failed, messages, (hits, misses)) in zip(inputs, results):
+
+      print(f"{path}: {'FAIL' if failed else 'PASS'}")
+
+      for message in messages:
+        print(message, end="")
+
+      failed_count += 1 if failed else 0
+
+      cache_hits += hits
+
+      cache_misses += misses
+
+  print(f"{failed_count} of {len(inputs)} inputs failed validation")
+
+  if cache_dir is not None:
+    print(f"Result cache: {cache_hits} hits, {cache_misses} misses")
+
+  return failed_count > 0
+
+def make_argument_parser() -> argparse.ArgumentParser:
+  '''Returns the parser of the command line arguments of the application'''
 
   parser = argparse.ArgumentParser(description='Verifies that an IMSC document conforms to the HRM')
-  parser.add_argument('input', help='Path to the input document')
+  parser.add_argument('input', nargs='+', help='Path to the input document, or to a directory of input documents')
   parser.add_argument('--verbose', action='store_true', help='Print additional debug messages')
   parser.add_argument('--itype', choices=['ttml', 'manifest'], default="ttml", help='Type of input')
+  parser.add_argument('--jobs', type=int, default=1, help='Number of processes used at each stage of processing')
+  parser.add_argument('--prefetch', type=int, default=0, help='Number of manifest documents read ahead of time')
+  parser.add_argument(
+    '--model-cache',
+    type=int,
+    default=0,
+    help='Number of parsed documents cached, per process, for reuse by identical documents'
+  )
+  parser.add_argument('--isd-cache', help='Path to a directory where the ISDs of documents are cached across runs')
+  parser.add_argument('--cache-dir', help='Path to a directory where validation results are cached across runs')
+  parser.add_argument(
+    '--cache-hash-contents',
+    action='store_true',
+    help='Key cached validation results on the contents of documents instead of their size and modification time'
+  )
+  parser.add_argument(
+    '--incremental',
+    metavar='RECORD',
+    help='Path to a record of the previous validation of the input, which is reused and updated'
+  )
+  parser.add_argument('--checkpoint', help='Path to a file where the progress of the validation is periodically saved')
+  parser.add_argument(
+    '--checkpoint-interval',
+    type=float,
+    default=5,
+    help='Minimum number of seconds between checkpoints'
+  )
+  parser.add_argument('--resume', action='store_true', help='Resume the validation from the checkpoint, if any')
+
+  return parser
+
+def run(args: argparse.Namespace) -> int:
+  '''Validates the inputs specified by the parsed command line arguments `args` and returns the exit status'''
+
+  try:
+    inputs = _expand_inputs(args.input, args.itype)
+  except ValueError as e:
+    LOGGER.error("%s", e)
+    return 2
+
+  if len(inputs) != 1 or inputs[0] != args.input[0]:
 
-  args = parser.parse_args(argv)
+    # batch mode
+
+    if args.incremental is not None:
+      LOGGER.error("Incremental validation requires a single input")
+      return 2
+
+    if args.checkpoint is not None:
+      LOGGER.error("Checkpoints require a single input")
+      return 2
+
+    return 1 if _validate_inputs(
+      inputs,
+      args.itype,
+      args.jobs,
+      args.prefetch,
+      args.model_cache,
+      args.isd_cache,
+      args.cache_dir,
+      args.cache_hash_contents
+    ) else 0
+
+  try:
+    return _run_input(args)
+  except ManifestError as e:
+    LOGGER.error("%s", e)
+    return 1
+
+def _run_input(args: argparse.Namespace) -> int:
+  '''Validates the single input specified by the parsed command line arguments `args` and returns the exit
+  status'''
 
   ev = EventHandler()
 
-  if args.itype is None or args.itype == "ttml":
-    doc_sequence = SingleLocalFile(args.input)
-  else:
-    doc_sequence = LocalFileSequence(args.input)
+  if args.checkpoint is not None:
+
+    if args.incremental is not None or args.cache_dir is not None:
+      LOGGER.error("Checkpoints cannot be combined with incremental validation or result caching")
+      return 2
+
+    error_count = imschrm.checkpoint.validate_resumable(
+      _make_doc_sequence(args.input[0], args.itype, args.prefetch),
+      args.checkpoint,
+      ev,
+      0,
+      0,
+      args.checkpoint_interval,
+      args.resume
+    )
+
+    # errors signalled before the checkpoint are not signalled again when resuming
+
+    if error_count > 0:
+      print("Validation failed")
+      return 1
+
+    return 0
+
+  model_cache = imschrm.doc_sequence.ModelCache(args.model_cache) if args.model_cache > 0 else None
+
+  isd_cache = imschrm.doc_sequence.ISDCache(args.isd_cache) if args.isd_cache is not None else None
+
+  result_cache = (
+    imschrm.result_cache.ResultCache(args.cache_dir, args.cache_hash_contents) if args.cache_dir is not None else None
+  )
+
+  _validate(args.input[0], args.itype, ev, args.jobs, args.prefetch, model_cache, isd_cache, result_cache, args.incremental)
+
+  LOGGER.debug("%s of %s non-empty ISDs were identical to the previous non-empty ISD", ev.repeated_isd_count, ev.isd_count)
+
+  if model_cache is not None:
+    LOGGER.debug("Model cache: %s hits, %s misses", model_cache.hits, model_cache.misses)
+
+  if isd_cache is not None:
+    LOGGER.debug("ISD cache: %s hits, %s misses", isd_cache.hits, isd_cache.misses)
+
+  if result_cache is not None:
+    print(f"Result cache: {result_cache.hits} hits, {result_cache.misses} misses")
+
+  if ev.failed:
+    print("Validation failed")
+    return 1
+
+  return 0
+
+def main(argv=None):
+  '''Main application processing'''
+
+  args = make_argument_parser().parse_args(argv)
 
   if args.verbose:
     logging.basicConfig(level=logging.DEBUG)
   else:
     logging.basicConfig(level=logging.WARNING)
 
+  status = run(args)
 
-  imschrm.hrm.validate(imschrm.doc_sequence.iter_isd(doc_sequence), ev, 0)
-
-  if ev.failed:
-    print("Validation failed")
-    sys.exit(1)
+  if status != 0:
+    sys.exit(status)
 
 if __name__ == "__main__":
   main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Validation daemon, which keeps the validator loaded between validations, and its client. The client
+accepts the same arguments as the command line application and forwards them to the daemon over a
+Unix domain socket.'''
+
+__author__ = "agent <agent@local>"
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import traceback
+import typing
+
+import imschrm.cli
+
+LOGGER = logging.getLogger(__name__)
+
+_SOCKET_NAME = "imschrm.sock"
+
+def default_socket_path() -> str:
+  '''Returns the default path of the socket of the daemon, which is located in `$XDG_RUNTIME_DIR` if defined, or
+  in a directory of the temporary directory that is private to the current user otherwise'''
+
+  runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+
+  if runtime_dir:
+    return os.path.join(runtime_dir, _SOCKET_NAME)
+
+  return os.path.join(tempfile.gettempdir(), f"imschrm-{os.getuid()}", _SOCKET_NAME)
+
+def _check_private_directory(path: str, create: bool):
+  '''Raises an exception unless `path` is a directory owned by, and only accessible to, the current user. The
+  directory is created if `create` is `True` and it does not exist.'''
+
+  if create:
+    try:
+      os.mkdir(path, 0o700)
+    except FileExistsError:
+      pass
+
+  path_stat = os.lstat(path)
+
+  if not stat.S_ISDIR(path_stat.st_mode) or path_stat.st_uid != os.getuid() or path_stat.st_mode & 0o077 != 0:
+    raise RuntimeError(f"{path} must be a directory owned by, and only accessible to, the current user")
+
+def _resolve_socket_path(socket_path: typing.Optional[str], create: bool) -> str:
+  '''Returns `socket_path`, or the default socket path if `socket_path` is `None`, in which case the directory
+  of the socket is checked, since it can be shared with other users'''
+
+  if socket_path is not None:
+    return socket_path
+
+  socket_path = default_socket_path()
+
+  if not os.environ.get("XDG_RUNTIME_DIR"):
+    _check_private_directory(os.path.dirname(socket_path), create)
+
+  return socket_path
+
+def _run_request(argv: typing.List[str], cwd: str) -> dict:
+  '''Runs the command line application with arguments `argv` in directory `cwd`, and returns its exit status
+  and output'''
+
+  stdout = io.StringIO()
+  stderr = io.StringIO()
+
+  log_handler = logging.StreamHandler(stderr)
+  log_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+  root_logger = logging.getLogger()
+  prev_level = root_logger.level
+  prev_cwd = os.getcwd()
+
+  root_logger.addHandler(log_handler)
+
+  try:
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+      os.chdir(cwd)
+
+      try:
+        args = imschrm.cli.make_argument_parser().parse_args(argv)
+        root_logger.setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+        status = imschrm.cli.run(args)
+      except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else 1
+      except Exception: # pylint: disable=broad-except
+        traceback.print_exc()
+        status = 1
+
+  finally:
+    os.chdir(prev_cwd)
+    root_logger.removeHandler(log_handler)
+    root_logger.setLevel(prev_level)
+
+  return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+  def handle(self):
+    request = json.loads(self.rfile.readline())
+
+    response = _run_request(request["argv"], request["cwd"])
+
+    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+class Server(socketserver.UnixStreamServer):
+  '''Validation daemon listening on the Unix domain socket at `socket_path`, or at `default_socket_path()` if
+  `socket_path` is `None`. Requests are processed one at a time.'''
+
+  def __init__(self, socket_path: typing.Optional[str] = None):
+    socket_path = _resolve_socket_path(socket_path, True)
+
+    # a stale socket is replaced, but any other file is left untouched and binding fails
+
+    _remove_socket(socket_path)
+
+    # only the current user can submit requests, from the moment the socket is created
+
+    prev_umask = os.umask(0o177)
+
+    try:
+      super().__init__(socket_path, _RequestHandler)
+    finally:
+      os.umask(prev_umask)
+
+  def server_close(self):
+    super().server_close()
+
+    _remove_socket(self.server_address)
+
+def _remove_socket(path: str):
+  '''Removes `path` if it is a socket'''
+
+  try:
+    if stat.S_ISSOCK(os.lstat(path).st_mode):
+      os.remove(path)
+  except FileNotFoundError:
+    pass
+
+def request(argv: typing.List[str], socket_path: typing.Optional[str] = None) -> dict:
+  '''Submits the command line arguments `argv` to the daemon listening at `socket_path`, or at
+  `default_socket_path()` if `socket_path` is `None`, and returns a dictionary with the `status`, `stdout` and
+  `stderr` of the validation'''
+
+  socket_path = _resolve_socket_path(socket_path, False)
+
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+    s.connect(socket_path)
+
+    with s.makefile("rwb") as f:
+      f.write(json.dumps({"argv": argv, "cwd": os.getcwd()}).encode("utf-8") + b"\n")
+      f.flush()
+
+      return json.loads(f.readline())
+
+def _add_socket_argument(parser: argparse.ArgumentParser):
+  parser.add_argument(
+    '--socket',
+    help='Path to the Unix domain socket of the daemon, by default in $XDG_RUNTIME_DIR or in a directory of the '
+         'temporary directory private to the current user'
+  )
+
+def daemon_main(argv=None):
+  '''Runs the validation daemon until interrupted'''
+
+  parser = argparse.ArgumentParser(description='Runs the IMSC HRM validation daemon')
+  _add_socket_argument(parser)
+
+  args = parser.parse_args(argv)
+
+  # messages from validations are only reported to the clients
+
+  log_handler = logging.StreamHandler()
+  log_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+  LOGGER.addHandler(log_handler)
+  LOGGER.setLevel(logging.INFO)
+  LOGGER.propagate = False
+
+  with Server(args.socket) as server:
+    LOGGER.info("Listening on %s", server.server_address)
+
+    try:
+      server.serve_forever()
+    except KeyboardInterrupt:
+      pass
+
+def client_main(argv=None):
+  '''Validates the inputs specified by the command line arguments using the validation daemon'''
+
+  parser = argparse.ArgumentParser(add_help=False)
+  _add_socket_argument(parser)
+
+  args, cli_argv = parser.parse_known_args(argv)
+
+  response = request(cli_argv, args.socket)
+
+  sys.stdout.write(response["stdout"])
+  sys.stderr.write(response["stderr"])
+
+  if response["status"] != 0:
+    sys.exit(response["status"])
+
+if __name__ == "__main__":
+  daemon_main()
@@ -29,30 +29,601 @@ __author__ = "Pierre-Anthony Lemieux <pal@palemieux.com>"
 
 import xml.etree.ElementTree as et
 import itertools
+import logging
+import heapq
+import bisect
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import tempfile
 import typing
+import mmap
+import weakref
 from numbers import Number
 
 import ttconv.imsc.reader
 import ttconv.isd
+import ttconv.model
+
+LOGGER = logging.getLogger(__name__)
 
 def _pairwise(iterable):
   a, b = itertools.tee(iterable)
   next(b, None)
   return zip(a, b)
 
-DocumentIterator = typing.Iterator[typing.Tuple[Number, Number, str]]
+class _TimelineSweep:
+  '''Generates the ISDs of a document at increasing offsets within `[start, end]` by sweeping its timeline
+  once. Timed children of body, div, p and span elements are linked into the document only while they
+  are active, so that `ttconv.isd.ISD.from_model` visits the active content only instead of the whole
+  document. Elements that are not active within `[start, end]` are never linked into the document. This
+  mutates the document, which must not be used for other purposes once the sweep has started.
+
+  The sweep also assigns a generation to each region of the ISDs it generates, see `region_generations()`.
+  '''
+
+  _SWEPT_PARENTS = (ttconv.model.Body, ttconv.model.Div, ttconv.model.P, ttconv.model.Span)
+
+  def __init__(
+    self,
+    doc: ttconv.model.ContentDocument,
+    sig_times: ttconv.isd.SignificantTimes,
+    start: Number,
+    end: typing.Optional[Number] = None
+    ):
+    self.doc = doc
+    self.sig_times = sig_times
+    self.start = start
+    self.end = end
+
+    # each swept parent maps to the ordered list of its children and the indices of its attached children
+    self.children: typing.Dict[ttconv.model.ContentElement, typing.List[ttconv.model.ContentElement]] = {}
+    self.attached: typing.Dict[ttconv.model.ContentElement, typing.Set[int]] = {}
+
+    # (time, sequence number, parent, child index, child interval) events at which the activity of a child changes
+    self.events = []
+
+    # the ISD regions generated from each single-region document, the offsets at which they can change, and
+    # their current generation and its position in these offsets
+    self.region_timelines: typing.List[typing.List] = []
+
+    for cached_doc in sig_times.cache():
+      region_ids = tuple(r.get_id() for r in cached_doc.doc.iter_regions()) or (ttconv.isd.ISD.DEFAULT_REGION_ID,)
+
+      self.region_timelines.append([region_ids, _change_offsets(cached_doc), None, None])
+
+      if cached_doc.doc.get_body() is not None:
+        self._detach_timed_children(cached_doc.interval_cache, cached_doc.doc.get_body())
+
+    heapq.heapify(self.events)
+
+  def _detach_timed_children(self, interval_cache, element: ttconv.model.ContentElement):
+
+    children = list(element)
+
+    if isinstance(element, _TimelineSweep._SWEPT_PARENTS) and \
+      any(c.get_begin() is not None or c.get_end() is not None for c in children):
+
+      attached = set()
+
+      for i, child in enumerate(children):
+
+        if child.get_begin() is None and child.get_end() is None:
+          attached.add(i)
+          continue
+
+        begin, end = interval_cache[child]
+
+        # the activity of the child at the start of the sweep is known, and only changes within the sweep
+        # are recorded
+
+        if begin <= self.start and (end is None or end > self.start):
+          attached.add(i)
+
+        for event_time in (begin, end):
+          if event_time is not None and event_time > self.start and (self.end is None or event_time <= self.end):
+            self.events.append((event_time, len(self.events), element, i, begin, end))
+
+      self.children[element] = children
+
+      self.attached[element] = attached
+
+      element.remove_children()
+
+      element.push_children(children[i] for i in sorted(attached))
+
+    for child in children:
+      self._detach_timed_children(interval_cache, child)
+
+  def isd_at(self, offset: Number) -> ttconv.isd.ISD:
+    '''Returns the ISD at `offset`, which must not be smaller than that of the previous call.'''
+
+    dirty_parents = set()
+
+    while len(self.events) > 0 and self.events[0][0] <= offset:
+      _, _, parent, i, begin, end = heapq.heappop(self.events)
+
+      if begin <= offset and (end is None or end > offset):
+        self.attached[parent].add(i)
+      else:
+        self.attached[parent].discard(i)
+
+      dirty_parents.add(parent)
+
+    for parent in dirty_parents:
+      parent.remove_children()
+      parent.push_children(self.children[parent][i] for i in sorted(self.attached[parent]))
+
+    isd = ttconv.isd.ISD.from_model(self.doc, offset, self.sig_times)
+
+    # the regions of a single-region document are unchanged since the previous ISD unless one of the
+    # offsets at which they can change was crossed
+
+    generations = {}
+
+    for timeline in self.region_timelines:
+      region_ids, offsets, generation, position = timeline
+
+      new_position = bisect.bisect_right(offsets, offset)
+
+      if new_position != position:
+        generation = next(_REGION_GENERATIONS)
+        timeline[2:] = (generation, new_position)
+
+      generations.update((region_id, generation) for region_id in region_ids)
+
+    _ISD_REGION_GENERATIONS[isd] = generations
+
+    return isd
+
+  def restore(self):
+    '''Links all the children detached by the sweep back into the document, which can then be swept again'''
+
+    for parent, children in self.children.items():
+      parent.remove_children()
+      parent.push_children(children)
+
+# generations are unique across sweeps
+
+_REGION_GENERATIONS = itertools.count()
+
+_ISD_REGION_GENERATIONS: "weakref.WeakKeyDictionary[ttconv.isd.ISD, typing.Dict[str, int]]" = weakref.WeakKeyDictionary()
+
+def region_generations(isd: ttconv.isd.ISD) -> typing.Optional[typing.Dict[str, int]]:
+  '''Returns a dictionary that maps the identifier of each region that `isd` can contain to its generation, or
+  `None` if unknown. Two ISD regions with the same generation are identical. Generations are known for the ISDs
+  generated by `iter_isd()` in the current process from a parsed document, but not for the ISDs read from an
+  `ISDCache` or generated by a pool of processes.'''
+
+  return _ISD_REGION_GENERATIONS.get(isd)
+
+def _change_offsets(cached_doc) -> typing.List[Number]:
+  '''Returns the sorted offsets at which an element of the single-region document of `cached_doc`, or one
+  of its animation steps, begins or ends, which are the only offsets at which the ISD regions generated from
+  the document can change. As in `ttconv.isd.ISD.from_model()`, animation steps are timed relative to the
+  element they animate.'''
+
+  interval_cache = cached_doc.interval_cache
+
+  offsets = set()
+
+  elements = list(cached_doc.doc.iter_regions())
+
+  if cached_doc.doc.get_body() is not None:
+    elements.append(cached_doc.doc.get_body())
+
+  while len(elements) > 0:
+    element = elements.pop()
+
+    begin, end = interval_cache[element]
+
+    offsets.add(begin)
+
+    if end is not None:
+      offsets.add(end)
+
+    for anim_step in element.iter_animation_steps():
+      offsets.add(begin + (anim_step.begin or 0))
+
+      if anim_step.end is not None:
+        offsets.add(begin + anim_step.end if end is None else min(begin + anim_step.end, end))
+
+    elements.extend(element)
+
+  return sorted(offsets)
+
+Document = typing.Union[str, bytes, bytearray, memoryview, mmap.mmap, typing.BinaryIO]
+
+DocumentIterator = typing.Iterator[typing.Tuple[Number, Number, Document]]
+
+_FEED_SIZE = 1 << 16
+
+def _iter_document_chunks(ttml_doc: Document) -> typing.Iterator[typing.Union[str, bytes, memoryview]]:
+  '''Splits a TTML document into chunks of at most `_FEED_SIZE` characters or bytes. Memory-mapped files are
+  read from their start, regardless of their current position.'''
+
+  if isinstance(ttml_doc, memoryview):
+    ttml_doc = ttml_doc.cast("B")
+
+  if isinstance(ttml_doc, (str, bytes, bytearray, memoryview, mmap.mmap)):
+    for i in range(0, len(ttml_doc), _FEED_SIZE):
+      yield ttml_doc[i:i + _FEED_SIZE]
+    return
+
+  while True:
+    chunk = ttml_doc.read(_FEED_SIZE)
+
+    if not chunk:
+      return
+
+    yield chunk
+
+class _XMLEventStream:
+  '''Sequence of the `start` and `end` events of a TTML document, which is fed to the XML parser one chunk at a
+  time as events are requested. Each event is numbered in the order it is produced by the parser.'''
+
+  def __init__(self, ttml_doc: Document):
+    self.parser = et.XMLPullParser(("start", "end"))
+    self.chunks = _iter_document_chunks(ttml_doc)
+    self.events = collections.deque()
+    self.produced = 0
+
+  def _fill(self) -> bool:
+    '''Reads at least one event from the parser, and returns `False` if the document is exhausted'''
+
+    produced = self.produced
+
+    while self.produced == produced:
+
+      if self.parser is None:
+        return False
+
+      chunk = next(self.chunks, None)
+
+      if chunk is None:
+        self.parser.close()
+
+      else:
+        self.parser.feed(chunk)
+
+      for event, elem in self.parser.read_events():
+        self.events.append((self.produced, event, elem))
+        self.produced += 1
+
+      if chunk is None:
+        self.parser = None
+
+    return True
+
+  def pop(self) -> typing.Tuple[int, str, et.Element]:
+    '''Returns the next `(sequence number, event, element)` event'''
+
+    if len(self.events) == 0 and not self._fill():
+      raise et.ParseError("no element found")
+
+    return self.events.popleft()
+
+  def read_past(self, seq: int):
+    '''Reads events from the parser until the event that follows event `seq` is produced. The parser
+    completes the text of an element, or the tail of an element, when it produces the next event.'''
+
+    while self.produced <= seq + 1 and self._fill():
+      pass
+
+  def close(self):
+    '''Parses the remainder of the document, which does not contain any element'''
+
+    while self._fill():
+      pass
+
+class _StreamedElement:
+  '''XML element whose children are parsed as they are iterated over. Once the iteration moves past a child,
+  the child, and all its descendants, are removed from the underlying XML tree, so that the XML tree never
+  holds more than the ancestors of the element being converted and their unvisited children. Only the
+  features of `xml.etree.ElementTree.Element` used by `ttconv.imsc.reader` are supported, i.e. the `tag`,
+  `attrib`, `text` and `tail` members, the `get()` method and iteration over children.'''
+
+  __slots__ = ("stream", "elem", "start_seq", "end_seq", "child", "tag", "attrib")
+
+  def __init__(self, stream: _XMLEventStream, elem: et.Element, start_seq: int):
+    self.stream = stream
+    self.elem = elem
+    self.start_seq = start_seq
+    self.end_seq: typing.Optional[int] = None
+    self.child: typing.Optional["_StreamedElement"] = None
+    self.tag = elem.tag
+    self.attrib = elem.attrib
+
+  def get(self, key, default=None):
+    return self.attrib.get(key, default)
+
+  @property
+  def text(self) -> typing.Optional[str]:
+    self.stream.read_past(self.start_seq)
+    return self.elem.text
+
+  @property
+  def tail(self) -> typing.Optional[str]:
+    self._skip_to_end()
+    self.stream.read_past(self.end_seq)
+    return self.elem.tail
+
+  def _skip_to_end(self):
+    for _ in self:
+      pass
+
+  def __iter__(self) -> typing.Iterator["_StreamedElement"]:
+    while True:
+
+      # the events of a child are consumed before the events that follow it
+
+      if self.child is not None:
+        self.child._skip_to_end()
+        self.elem.remove(self.child.elem)
+        self.child = None
+
+      if self.end_seq is not None:
+        return
+
+      seq, event, elem = self.stream.pop()
+
+      if event == "start":
+        self.child = _StreamedElement(self.stream, elem, seq)
+        yield self.child
+      else:
+        self.end_seq = seq
+
+class _StreamedTree:
+  '''XML tree of a TTML document, which is parsed incrementally as it is converted by `ttconv.imsc.reader`'''
+
+  def __init__(self, ttml_doc: Document):
+    self.stream = _XMLEventStream(ttml_doc)
+
+    seq, _, elem = self.stream.pop()
+
+    self.root = _StreamedElement(self.stream, elem, seq)
+
+  def getroot(self) -> _StreamedElement:
+    return self.root
+
+  def close(self):
+    '''Parses the remainder of the document, which detects any trailing content that is not well-formed'''
+    self.root._skip_to_end()
+    self.stream.close()
+
+def _to_model(ttml_doc: Document) -> typing.Optional[ttconv.model.ContentDocument]:
+  '''Converts a TTML document provided as a string, a bytes-like object (including a memory-mapped file) or a
+  binary file object to the data model. The XML elements of the document are parsed as they are converted, and
+  discarded once converted, so that the XML tree of the document is never held in memory in its entirety.'''
+
+  if isinstance(ttml_doc, (str, bytes)) and len(ttml_doc) <= _FEED_SIZE:
+
+    # small documents are parsed at once, which is faster
+
+    return ttconv.imsc.reader.to_model(et.ElementTree(et.fromstring(ttml_doc)))
+
+  xml_tree = _StreamedTree(ttml_doc)
+
+  m = ttconv.imsc.reader.to_model(xml_tree)
+
+  xml_tree.close()
+
+  return m
+
+def _to_picklable_document(ttml_doc: Document) -> Document:
+  if isinstance(ttml_doc, (str, bytes)):
+    return ttml_doc
+
+  if isinstance(ttml_doc, (bytearray, memoryview, mmap.mmap)):
+    return bytes(ttml_doc)
 
-def iter_isd(doc_iterator: DocumentIterator, tolerance=0):
+  return ttml_doc.read()
+
+class ModelCache:
+  '''Least-recently used cache of the data models of TTML documents, and of their significant times, keyed
+  by a hash of the content of the documents. At most `capacity` documents are cached. `hits` and `misses`
+  count the documents that were and were not found in the cache, respectively.
+  '''
+
+  def __init__(self, capacity: int = 16):
+    self.capacity = capacity
+    self.hits = 0
+    self.misses = 0
+    self._entries: typing.OrderedDict[bytes, typing.Tuple[ttconv.model.ContentDocument, ttconv.isd.SignificantTimes]] = \
+      collections.OrderedDict()
+
+  def __len__(self):
+    return len(self._entries)
+
+  def acquire(self, key: bytes) -> typing.Optional[typing.Tuple[ttconv.model.ContentDocument, ttconv.isd.SignificantTimes]]:
+    '''Removes the `(model, significant times)` entry with key `key` from the cache and returns it, or returns `None`
+    if there is no such entry. An acquired entry is not shared since its model is modified while its ISDs are
+    generated.'''
+
+    entry = self._entries.pop(key, None)
+
+    if entry is None:
+      self.misses += 1
+    else:
+      self.hits += 1
+
+    return entry
+
+  def release(self, key: bytes, entry: typing.Tuple[ttconv.model.ContentDocument, ttconv.isd.SignificantTimes]):
+    '''Adds the entry `entry` with key `key` to the cache, evicting the least-recently used entries if needed'''
+
+    if self.capacity < 1:
+      return
+
+    self._entries[key] = entry
+
+    self._entries.move_to_end(key)
+
+    while len(self._entries) > self.capacity:
+      self._entries.popitem(last=False)
+
+def _document_key(ttml_doc: typing.Union[str, bytes, bytearray, memoryview, mmap.mmap]) -> bytes:
+  if isinstance(ttml_doc, str):
+    ttml_doc = ttml_doc.encode("utf-8")
+
+  return hashlib.blake2b(ttml_doc, digest_size=16).digest()
+
+_CACHE_FORMAT_VERSION = 1
+
+def _package_version(name: str) -> str:
+  try:
+    return importlib.metadata.version(name)
+  except importlib.metadata.PackageNotFoundError:
+    return "unknown"
+
+@functools.lru_cache(maxsize=None)
+def _source_version() -> str:
+  '''Returns a hash of the sources of imschrm, which identifies the ISDs and HRM statistics that it computes. Unlike
+  the version of the package, the hash is known when imschrm is run from its sources, and changes whenever they
+  are edited.'''
+
+  package_dir = os.path.dirname(os.path.abspath(__file__))
+
+  h = hashlib.blake2b(digest_size=16)
+
+  try:
+    for name in sorted(os.listdir(package_dir)):
+      if name.endswith(".py"):
+        with open(os.path.join(package_dir, name), "rb") as f:
+          source = f.read()
+
+        h.update(f"{name} {len(source)} ".encode("utf-8"))
+        h.update(source)
+
+  except OSError:
+    return _package_version("imschrm")
+
+  return h.hexdigest()
+
+class _CachedISDSequence:
+  '''ISD sequence of a document read from an `ISDCache` file, which holds the ISDs of the document, in order,
+  followed by the offsets of the ISDs and their positions in the file'''
+
+  def __init__(self, f: typing.BinaryIO):
+    self.file = f
+
+    f.seek(-8, 2)
+    f.seek(int.from_bytes(f.read(8), "little"))
+
+    self.offsets, self.positions = pickle.load(f)
+
+  def isd_at(self, offset: Number) -> ttconv.isd.ISD:
+    self.file.seek(self.positions[bisect.bisect_left(self.offsets, offset)])
+    return pickle.load(self.file)
+
+  def close(self):
+    self.file.close()
+
+class ISDCache:
+  '''Persistent cache of the ISD sequences of TTML documents, stored as one file per document in `directory`.
+  Entries are keyed by a hash of the content of the document, of the version of ttconv and of the sources of
+  imschrm, so that entries created by other versions are ignored. `hits` and `misses` count the documents that were and were
+  not found in the cache, respectively. Cache files are unpickled and the directory must therefore be trusted.
+  '''
+
+  def __init__(self, directory: str):
+    self.directory = directory
+    self.hits = 0
+    self.misses = 0
+    self.versions = f"{_CACHE_FORMAT_VERSION} {_package_version('ttconv')} {_source_version()}".encode("utf-8")
+
+    os.makedirs(directory, exist_ok=True)
+
+  def _path(self, key: bytes) -> str:
+    return os.path.join(self.directory, hashlib.blake2b(self.versions + key, digest_size=16).hexdigest() + ".isds")
+
+  def _open(self, key: bytes) -> typing.Optional[_CachedISDSequence]:
+    try:
+      f = open(self._path(key), "rb")
+    except OSError:
+      return None
+
+    try:
+      return _CachedISDSequence(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+      f.close()
+      return None
+
+  def load(self, key: bytes) -> typing.Optional[_CachedISDSequence]:
+    '''Returns the ISD sequence of the document with key `key`, or `None` if it is not in the cache'''
+
+    cached_isds = self._open(key)
+
+    if cached_isds is None:
+      self.misses += 1
+    else:
+      self.hits += 1
+
+    return cached_isds
+
+  def store(self, key: bytes, offsets: typing.Tuple[Number, ...], isds: typing.Iterable[ttconv.isd.ISD]) -> _CachedISDSequence:
+    '''Stores the ISD sequence `isds` of the document with key `key`, where the ISDs are at the
+    significant times `offsets`, and returns the stored sequence'''
+
+    with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as f:
+      try:
+        positions = []
+
+        for isd in isds:
+          positions.append(f.tell())
+          pickle.dump(isd, f, pickle.HIGHEST_PROTOCOL)
+
+        header_position = f.tell()
+        pickle.dump((offsets, positions), f, pickle.HIGHEST_PROTOCOL)
+        f.write(header_position.to_bytes(8, "little"))
+
+      except BaseException:
+        f.close()
+        os.remove(f.name)
+        raise
+
+    # readers never see incomplete files
+
+    os.replace(f.name, self._path(key))
+
+    return _CachedISDSequence(open(self._path(key), "rb"))
+
+def iter_isd(
+  doc_iterator: DocumentIterator,
+  tolerance=0,
+  max_workers: int=1,
+  model_cache: typing.Optional[ModelCache]=None,
+  isd_cache: typing.Optional[ISDCache]=None
+  ):
   '''Iterates through the ISDs resulting from a sequence of TTML documents obtained from `doc_iterator`.
-  `doc_iterator` returns a sequence of tuplets `(begin, end, doc)`, where `doc` is a string representation of
-  a valid TTML document active in the interval `[begin, end)` expressed in seconds. The intervals are
+  `doc_iterator` returns a sequence of tuplets `(begin, end, doc)`, where `doc` is a valid TTML document active in
+  the interval `[begin, end)` expressed in seconds. `doc` is either a string, a bytes-like object (including a
+  memory-mapped file) or a binary file object, and is parsed without conversion. The intervals are
   non-overlapping and sorted in order of increasing `begin` time. `tolerance` specifies the numerical
-  tolerance to use when comparing document intervals.
+  tolerance to use when comparing document intervals. If `max_workers` is greater than 1, documents
+  are parsed and processed into ISDs ahead of time by a pool of `max_workers` processes. If `model_cache` is
+  provided, the data models of documents with identical contents are reused instead of being parsed again. If
+  `isd_cache` is provided, the complete ISD sequence of each document is read from the cache, or generated and
+  stored in the cache if absent. When `max_workers` is greater than 1, each process uses its own model cache with
+  the capacity of `model_cache`, and the counters of the caches are updated as the ISDs are returned. Returns the
+  time at which the last ISD ends, or `None` if the sequence ended with a document that does not end.
   '''
-  
+
+  if max_workers > 1:
+    doc_isds_iterator = _iter_doc_isds_parallel(doc_iterator, tolerance, max_workers, model_cache, isd_cache)
+  else:
+    doc_isds_iterator = (
+      (doc_begin, _iter_doc_isd(doc_begin, doc_end, ttml_doc, tolerance, model_cache, isd_cache))
+      for doc_begin, doc_end, ttml_doc in doc_iterator
+    )
+
   cur_time = None
 
-  for doc_begin, doc_end, ttml_doc in doc_iterator:
+  for doc_begin, doc_isds in doc_isds_iterator:
 
     if cur_time is not None:
 
@@ -65,24 +636,282 @@ def iter_isd(doc_iterator: DocumentIterator, tolerance=0):
         # insert a null ISD if there is a gap between documents
 
         yield (cur_time, None)
-      
-    cur_time = doc_begin
 
-    m = ttconv.imsc.reader.to_model(et.ElementTree(et.fromstring(ttml_doc)))
+    cur_time = yield from doc_isds
+
+    if cur_time is None:
+      return None
+
+  return cur_time
+
+def _iter_window_isd(
+  doc_begin: Number,
+  doc_end: typing.Optional[Number],
+  tolerance,
+  offsets: typing.Tuple[Number, ...],
+  make_isd_at: typing.Callable[[Number, typing.Optional[Number]], typing.Callable[[Number], ttconv.isd.ISD]],
+  start_position: typing.Optional[int] = None,
+  with_positions: bool = False
+  ):
+  '''Iterates through the ISDs, at significant times `offsets`, of a document active in the interval
+  `[doc_begin, doc_end)`, and returns the time at which the last ISD ends, or `None` if it does not end.
+  `make_isd_at(start, end)` returns a function that returns the ISD at a given offset within `[start, end]`.
+  If `with_positions` is `True`, the position in `offsets` of the significant time of each ISD is returned
+  alongside the ISD. An iteration can be continued from an ISD by specifying its begin time as `doc_begin` and
+  its position as `start_position`.'''
+
+  cur_time = doc_begin
+
+  if start_position is not None:
+    first_index = start_position
+
+  else:
+
+    # skip the significant times that precede the document interval
+
+    first_index = max(0, bisect.bisect_right(offsets, cur_time - tolerance) - 1)
+
+    if first_index > 0 and doc_end is not None and cur_time - doc_end >= (-tolerance):
+      return doc_end
+
+  window_sig_times = offsets[first_index:]
+
+  if len(window_sig_times) > 0:
+    isd_at = make_isd_at(window_sig_times[0], doc_end)
+
+  for position, (left_side, right_side) in enumerate(_pairwise(window_sig_times + (None,)), first_index):
+
+    if cur_time - left_side >= (-tolerance) and (right_side is None or right_side - cur_time > (-tolerance) ):
+
+      yield (cur_time, position, isd_at(left_side)) if with_positions else (cur_time, isd_at(left_side))
+
+      if right_side is None:
+        return None
+
+      cur_time = right_side
+
+    if doc_end is not None and cur_time - doc_end >= (-tolerance):
+      return doc_end
+
+  return cur_time
+
+def _iter_doc_isd(
+  doc_begin: Number,
+  doc_end: typing.Optional[Number],
+  ttml_doc: Document,
+  tolerance,
+  model_cache: typing.Optional[ModelCache] = None,
+  isd_cache: typing.Optional[ISDCache] = None,
+  start_position: typing.Optional[int] = None,
+  with_positions: bool = False
+  ):
+  '''Iterates through the ISDs of a single TTML document `ttml_doc` active in the interval `[doc_begin, doc_end)`
+  and returns the time at which the last ISD ends, or `None` if it does not end. See `_iter_window_isd()` for
+  `start_position` and `with_positions`.'''
+
+  if model_cache is not None or isd_cache is not None:
+
+    # the contents of file objects are needed to compute their hash
+
+    if not isinstance(ttml_doc, (str, bytes, bytearray, memoryview, mmap.mmap)):
+      ttml_doc = ttml_doc.read()
+
+    key = _document_key(ttml_doc)
+
+  if isd_cache is not None:
+
+    cached_isds = isd_cache.load(key)
+
+    if cached_isds is None:
+
+      # generate and store the complete ISD sequence of the document, independently of the document interval,
+      # which can then be reused for any interval and tolerance
+
+      with _DocumentModel(ttml_doc, model_cache, key) as (m, sig_times):
+        sweep = _TimelineSweep(m, sig_times, sig_times.offsets()[0]) if len(sig_times.offsets()) > 0 else None
+
+        try:
+          cached_isds = isd_cache.store(key, sig_times.offsets(), (sweep.isd_at(offset) for offset in sig_times.offsets()))
+        except (OSError, pickle.PicklingError, RecursionError) as e:
+          LOGGER.warning("Cannot store the ISDs of the document in the cache: %s", e)
+        finally:
+          _restore_sweep(sweep, model_cache)
+
+    if cached_isds is not None:
+      try:
+        return (yield from _iter_window_isd(
+          doc_begin,
+          doc_end,
+          tolerance,
+          cached_isds.offsets,
+          lambda start, end: cached_isds.isd_at,
+          start_position,
+          with_positions
+        ))
+      finally:
+        cached_isds.close()
+
+  with _DocumentModel(ttml_doc, model_cache, key if model_cache is not None else None) as (m, sig_times):
+
+    sweep = None
+
+    def _make_sweep(start, end):
+      nonlocal sweep
+      sweep = _TimelineSweep(m, sig_times, start, end)
+      return sweep.isd_at
+
+    try:
+      return (yield from _iter_window_isd(
+        doc_begin,
+        doc_end,
+        tolerance,
+        sig_times.offsets(),
+        _make_sweep,
+        start_position,
+        with_positions
+      ))
+    finally:
+      _restore_sweep(sweep, model_cache)
+
+def _restore_sweep(sweep: typing.Optional[_TimelineSweep], model_cache: typing.Optional[ModelCache]):
+  '''Restores a swept document if it is returned to the model cache'''
+
+  if sweep is not None and model_cache is not None:
+    sweep.restore()
+
+class _DocumentModel:
+  '''Context manager that provides the data model of a document, and its significant times, from `model_cache`
+  if present, or by parsing the document otherwise. The data model is returned to `model_cache` on exit.'''
+
+  def __init__(self, ttml_doc: Document, model_cache: typing.Optional[ModelCache], key: typing.Optional[bytes]):
+    self.ttml_doc = ttml_doc
+    self.model_cache = model_cache
+    self.key = key
+    self.entry = None
+
+  def __enter__(self) -> typing.Tuple[ttconv.model.ContentDocument, ttconv.isd.SignificantTimes]:
+    if self.model_cache is not None:
+      self.entry = self.model_cache.acquire(self.key)
+
+    if self.entry is None:
+      m = _to_model(self.ttml_doc)
+      self.entry = (m, ttconv.isd.ISD.significant_times(m))
+
+    return self.entry
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if self.model_cache is not None:
+      self.model_cache.release(self.key, self.entry)
+
+_worker_model_cache: typing.Optional[ModelCache] = None
+
+_worker_isd_cache: typing.Optional[ISDCache] = None
+
+def _init_worker_caches(model_cache_capacity: typing.Optional[int], isd_cache_directory: typing.Optional[str]):
+  global _worker_model_cache, _worker_isd_cache # pylint: disable=global-statement
+
+  _worker_model_cache = ModelCache(model_cache_capacity) if model_cache_capacity is not None else None
+  _worker_isd_cache = ISDCache(isd_cache_directory) if isd_cache_directory is not None else None
+
+def _cache_counts(cache: typing.Union[ModelCache, ISDCache, None]) -> typing.Tuple[int, int]:
+  return (0, 0) if cache is None else (cache.hits, cache.misses)
+
+def _list_doc_isd(doc: typing.Tuple[Number, typing.Optional[Number], Document, Number]):
+  '''Returns the ISDs of a single document, as a list, the time at which the last ISD ends, and the number of
+  hits and misses of the model and ISD caches of the process'''
+
+  prev_counts = (_cache_counts(_worker_model_cache), _cache_counts(_worker_isd_cache))
+
+  doc_isds = []
+
+  doc_isd_iterator = _iter_doc_isd(*doc, _worker_model_cache, _worker_isd_cache)
+
+  while True:
+    try:
+      doc_isds.append(next(doc_isd_iterator))
+    except StopIteration as e:
+      end_time = e.value
+      break
+
+  counts = tuple(
+    (hits - prev_hits, misses - prev_misses)
+    for (hits, misses), (prev_hits, prev_misses) in zip((_cache_counts(_worker_model_cache), _cache_counts(_worker_isd_cache)), prev_counts)
+  )
+
+  return (doc_isds, end_time, counts)
+
+def _replay_doc_isd(
+  doc_isds: typing.List,
+  end_time: typing.Optional[Number],
+  counts: typing.Tuple[typing.Tuple[int, int], typing.Tuple[int, int]],
+  caches: typing.Tuple[typing.Optional[ModelCache], typing.Optional[ISDCache]]
+  ):
+
+  for cache, (hits, misses) in zip(caches, counts):
+    if cache is not None:
+      cache.hits += hits
+      cache.misses += misses
+
+  yield from doc_isds
+
+  return end_time
+
+def _receive_doc_isd(
+  doc: typing.Tuple[Number, typing.Optional[Number], Document, Number],
+  future: concurrent.futures.Future,
+  caches: typing.Tuple[typing.Optional[ModelCache], typing.Optional[ISDCache]]
+  ):
+  '''Returns an iterator over the ISDs of the document `doc` processed by `future`, or over the ISDs generated
+  by the current process if they cannot be returned by the worker process'''
+
+  try:
+    result = future.result()
+  except (pickle.PicklingError, RecursionError) as e:
+    # the ISDs of a document with many sibling elements exceed the recursion limit of pickle
+    LOGGER.warning("Cannot receive the ISDs of the document from a worker process, processing it serially: %s", e)
+    return _iter_doc_isd(*doc, *caches)
+
+  return _replay_doc_isd(*result, caches)
+
+def _iter_doc_isds_parallel(
+  doc_iterator: DocumentIterator,
+  tolerance,
+  max_workers: int,
+  model_cache: typing.Optional[ModelCache] = None,
+  isd_cache: typing.Optional[ISDCache] = None
+  ):
+
+  pending = collections.deque()
+
+  caches = (model_cache, isd_cache)
+
+  executor = concurrent.futures.ProcessPoolExecutor(
+    max_workers,
+    initializer=_init_worker_caches,
+    initargs=(
+      model_cache.capacity if model_cache is not None else None,
+      isd_cache.directory if isd_cache is not None else None
+    )
+  )
+
+  with executor:
+
+    for doc_begin, doc_end, ttml_doc in doc_iterator:
 
-    sig_times = ttconv.isd.ISD.significant_times(m)
+      # file objects and memory-mapped files cannot be sent to worker processes
 
-    for left_side, right_side in _pairwise(tuple(sig_times) + (None,)):
+      ttml_doc = _to_picklable_document(ttml_doc)
 
-      if cur_time - left_side >= (-tolerance) and (right_side is None or right_side - cur_time > (-tolerance) ):
+      doc = (doc_begin, doc_end, ttml_doc, tolerance)
 
-        yield (cur_time, ttconv.isd.ISD.from_model(m, left_side, sig_times))
+      pending.append((doc, executor.submit(_list_doc_isd, doc)))
 
-        if right_side is None:
-          return
+      # limit the number of documents processed ahead of time
 
-        cur_time = right_side
+      if len(pending) > 2 * max_workers:
+        doc, future = pending.popleft()
+        yield (doc[0], _receive_doc_isd(doc, future, caches))
 
-      if doc_end is not None and cur_time - doc_end >= (-tolerance):
-        cur_time = doc_end
-        break
+    while len(pending) > 0:
+      doc, future = pending.popleft()
+      yield (doc[0], _receive_doc_isd(doc, future, caches))
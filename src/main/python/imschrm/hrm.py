@@ -28,6 +28,9 @@
 __author__ = "Pierre-Anthony Lemieux <pal@palemieux.com>"
 
 import typing
+import collections
+import concurrent.futures
+import functools
 from dataclasses import dataclass
 from fractions import Fraction
 from numbers import Number
@@ -37,8 +40,15 @@ import ttconv.isd
 import ttconv.style_properties as styles
 import ttconv.model
 
+import imschrm.doc_sequence
+
 from .codepoint_sets import GCPY_12, RENGI_06
 
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
 LOGGER = logging.getLogger(__name__)
 
 _BDRAW = 12
@@ -63,6 +73,7 @@ class ISDStatistics:
   gcpy_count: Number = 0 # Total number of glyphs copied
   gren_count: Number = 0 # Total number of glyphs rendered
   is_empty: bool = False # Does the ISD contain any content
+  is_repeated: bool = False # Is the ISD identical to the last non-empty ISD
 
 
 class EventHandler:
@@ -99,24 +110,44 @@ class EventHandler:
     LOGGER.debug(EventHandler._format_message(msg, doc_index, time_offset, available_time, stats))
 
 
-def validate(isd_iterator: typing.Iterator[typing.Tuple[Fraction, ttconv.isd.ISD]], event_handler: typing.Type[EventHandler]=EventHandler(), tolerance: float=0):
+def validate(
+  isd_iterator: typing.Iterator[typing.Tuple[Fraction, ttconv.isd.ISD]],
+  event_handler: typing.Type[EventHandler]=EventHandler(),
+  tolerance: float=0,
+  max_workers: int=1
+  ):
   '''Determines whether the sequence of ISDs returned by `isd_iterator` conform to the IMSC HRM.
   `isd_iterator` returns a sequence of tuplets `(begin, ISD)`, where `ISD` is an ISD instance whose
   active interval starts at `begin` seconds and ends immediately before the `begin` value of the next 
   ISD. Errors, warnings and info messages are signalled through callbacks on the `event_handler`.
+  If `max_workers` is greater than 1, ISDs are evaluated in parallel by a pool of `max_workers` processes,
+  with identical results. The ISDs are however reduced to fingerprints in the calling process, which walks
+  their regions and glyphs and accounts for a large part of their evaluation, so that the speedup remains below
+  2x regardless of `max_workers`. Long sequences of documents are better split with `imschrm.shard`.
   '''
 
-  hrm = HRM()
+  if max_workers > 1:
+    stats_iterator = _iter_stats_parallel(isd_iterator, max_workers)
+  else:
+    stats_iterator = _iter_stats(isd_iterator)
+
+  validate_stats(stats_iterator, event_handler, tolerance)
 
-  last_render_time = -_IPD
+def validate_stats(
+  stats_iterator: typing.Iterator[typing.Tuple[Fraction, ISDStatistics]],
+  event_handler: EventHandler,
+  tolerance: float,
+  last_render_time: Number = -_IPD,
+  first_doc_index: int = 0
+  ):
+  '''Signals the events that result from the `(begin, ISD statistics)` sequence returned by `stats_iterator`.
+  `last_render_time` and `first_doc_index` allow a validation to be continued from a given ISD.'''
 
-  for doc_index, (time_offset, isd) in enumerate(isd_iterator):
+  for doc_index, (time_offset, stats) in enumerate(stats_iterator, first_doc_index):
 
     if time_offset <= last_render_time:
       raise RuntimeError("ISDs are not in order of increasing offset")
 
-    stats = hrm.next_isd(isd)
-
     avail_render_time = min(_IPD, time_offset - last_render_time)
 
     event_handler.debug("Processed document", doc_index, time_offset, avail_render_time, stats)
@@ -130,168 +161,345 @@ def validate(isd_iterator: typing.Iterator[typing.Tuple[Fraction, ttconv.isd.ISD
 
       last_render_time = time_offset
 
+def _iter_stats(isd_iterator: typing.Iterator[typing.Tuple[Fraction, ttconv.isd.ISD]]):
+  hrm = HRM()
+
+  for time_offset, isd in isd_iterator:
+    yield (time_offset, hrm.next_isd(isd))
+
+# number of consecutive ISDs evaluated by each task of `_iter_stats_parallel()`
+
+_PARALLEL_CHUNK_SIZE = 64
+
+def _evaluate_fingerprints(
+  prev_fingerprint: typing.Optional[typing.Tuple],
+  fingerprints: typing.List[typing.Tuple]
+  ) -> typing.List[ISDStatistics]:
+  '''Returns the statistics of consecutive ISDs whose fingerprints are `fingerprints`, given that
+  `prev_fingerprint` is the fingerprint of the last non-empty ISD that precedes them'''
+
+  hrm = HRM()
+
+  hrm.restore(prev_fingerprint)
+
+  return [hrm.next_fingerprint(fingerprint) for fingerprint in fingerprints]
+
+def _iter_stats_parallel(isd_iterator: typing.Iterator[typing.Tuple[Fraction, ttconv.isd.ISD]], max_workers: int):
+  # the only state carried by the HRM across ISDs is the set of glyphs of the last non-empty ISD, so
+  # chunks of consecutive ISDs are evaluated independently alongside the last non-empty ISD that precedes
+  # them. ISDs are sent to the workers as fingerprints, which are flat and compact, unlike the ISDs themselves,
+  # whose serialization costs several times more than their fingerprinting. Only the evaluation of the
+  # fingerprints is therefore parallel.
+
+  pending = collections.deque()
+
+  # only used to compute the fingerprints of the ISDs
+
+  fingerprinter = HRM()
+
+  prev_fingerprint = None
+
+  last_fingerprint = None
+
+  offsets = []
+
+  fingerprints = []
+
+  with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+
+    for time_offset, isd in isd_iterator:
+
+      fingerprint = fingerprinter._fingerprint(isd)
+
+      offsets.append(time_offset)
 
-@dataclass(frozen=True)
-class _Glyph:
-  char: str
-  color : styles.ColorType
-  font_family: typing.Tuple[typing.Union[str, styles.GenericFontFamilyType]]
-  font_size: styles.LengthType
-  font_style: styles.FontStyleType
-  font_weight: styles.FontWeightType
-  text_decoration: styles.TextDecorationType
-  text_outline: styles.TextOutlineType
-  text_shadow: styles.TextShadowType
-  background_color: styles.ColorType
+      fingerprints.append(fingerprint)
+
+      if len(fingerprint) > 0:
+        last_fingerprint = fingerprint
+
+      if len(fingerprints) == _PARALLEL_CHUNK_SIZE:
+        pending.append((offsets, executor.submit(_evaluate_fingerprints, prev_fingerprint, fingerprints)))
+        prev_fingerprint = last_fingerprint
+        offsets = []
+        fingerprints = []
+
+      # limit the number of ISDs held in memory
+
+      if len(pending) > 2 * max_workers:
+        chunk_offsets, future = pending.popleft()
+        yield from zip(chunk_offsets, future.result())
+
+    if len(fingerprints) > 0:
+      pending.append((offsets, executor.submit(_evaluate_fingerprints, prev_fingerprint, fingerprints)))
+
+    while len(pending) > 0:
+      chunk_offsets, future = pending.popleft()
+      yield from zip(chunk_offsets, future.result())
+
+# style properties that, together with the character, determine the identity of a glyph
+
+_GLYPH_STYLE_PROPS = (
+  styles.StyleProperties.Color,
+  styles.StyleProperties.FontFamily,
+  styles.StyleProperties.FontSize,
+  styles.StyleProperties.FontStyle,
+  styles.StyleProperties.FontWeight,
+  styles.StyleProperties.TextDecoration,
+  styles.StyleProperties.TextOutline,
+  styles.StyleProperties.TextShadow,
+  styles.StyleProperties.BackgroundColor
+)
+
+# glyphs are identified by an integer key that combines the codepoint of the character (21 bits) with an
+# identifier of its glyph style
+
+_CODEPOINT_BITS = 21
+
+_CODEPOINT_MASK = (1 << _CODEPOINT_BITS) - 1
+
+_FONT_SIZE_INDEX = _GLYPH_STYLE_PROPS.index(styles.StyleProperties.FontSize)
+
+# minimum number of codepoints for which classification is vectorized, if numpy is available
+
+_VECTORIZE_MIN_LENGTH = 32
+
+_GCPY_12_CLASS = 1
+
+_RENGI_06_CLASS = 2
 
 class HRM:
 
   def __init__(self):
-    self.back_buffer: typing.Set[_Glyph] = set()
+    self.back_buffer: typing.Set[int] = set()
     self.isd_stats: ISDStatistics = None
-    
+    self.glyph_styles: typing.Dict[typing.Tuple, int] = {}
+    self.glyph_style_nrga: typing.List[Number] = []
+    self.fingerprint: typing.Optional[typing.Tuple] = None
+    self.glyphs: typing.List[int] = []
+    self.glyph_counts: typing.Counter[int] = collections.Counter()
+    self.fingerprint_hits: int = 0
+    self.fingerprint_misses: int = 0
+    self.region_glyphs: typing.Dict[typing.Tuple, typing.Tuple[int, ...]] = {}
+    self.region_hits: int = 0
+    self.region_misses: int = 0
+    self.generation_fingerprints: typing.Dict[int, typing.Optional[typing.Tuple]] = {}
+
+  def _glyph_style_id(self, glyph_style: typing.Tuple) -> int:
+    '''Returns the integer identifier of `glyph_style`, interning it if necessary'''
+
+    style_id = self.glyph_styles.get(glyph_style)
+
+    if style_id is None:
+      # the NRGA of a glyph is fully determined by its font size, which is part of its style
+      self.glyph_style_nrga.append(_compute_nrga(glyph_style[_FONT_SIZE_INDEX]))
+      style_id = len(self.glyph_styles)
+      self.glyph_styles[glyph_style] = style_id
+
+    return style_id
+
+  def restore(self, fingerprint: typing.Optional[typing.Tuple]):
+    '''Restores the state of the HRM that immediately follows a non-empty ISD whose fingerprint is `fingerprint`,
+    or the initial state if `fingerprint` is `None`. The state of the HRM is entirely determined by the glyphs of
+    the last non-empty ISD, and is therefore captured by `HRM.fingerprint`.'''
+
+    self.fingerprint = None
+    self.glyphs = []
+    self.glyph_counts = collections.Counter()
+    self.region_glyphs = {}
+    self.generation_fingerprints = {}
+
+    if fingerprint is not None:
+      self._update_glyph_counts(fingerprint)
+
+    self.back_buffer = set(self.glyph_counts)
+
   def next_isd(
     self,
     isd: typing.Type[ttconv.isd.ISD]
     ) -> ISDStatistics:
 
-    self.isd_stats = ISDStatistics()
+    return self.next_fingerprint(self._fingerprint(isd))
+
+  def _fingerprint(self, isd: typing.Optional[ttconv.isd.ISD]) -> typing.Tuple:
+    '''Returns the fingerprint of `isd`, see `_isd_fingerprint()`. The fingerprint of a region whose generation,
+    see `imschrm.doc_sequence.region_generations()`, is that of a region of the previous ISD is reused without
+    walking the region, so that the fingerprint of an ISD identical to the previous one is compared in constant
+    time per region.'''
 
-    self.isd_stats.is_empty = True
+    generations = None if isd is None else imschrm.doc_sequence.region_generations(isd)
 
-    if isd is not None:
-      for region in isd.iter_regions():
+    if generations is None:
+      self.generation_fingerprints = {}
+      return _isd_fingerprint(isd)
 
-        if not _is_presented_region(region):
-          continue
+    generation_fingerprints = {}
 
-        self.isd_stats.is_empty = False
+    for region in isd.iter_regions():
+      generation = generations[region.get_id()]
 
-    if not self.isd_stats.is_empty:
+      if generation in self.generation_fingerprints:
+        region_fingerprint = self.generation_fingerprints[generation]
+      else:
+        region_fingerprint = _region_fingerprint(region) if _is_presented_region(region) else None
+
+      generation_fingerprints[generation] = region_fingerprint
+
+    self.generation_fingerprints = generation_fingerprints
+
+    return tuple(f for f in generation_fingerprints.values() if f is not None)
+
+  def next_fingerprint(self, fingerprint: typing.Tuple) -> ISDStatistics:
+    '''Evaluates the ISD whose fingerprint, as computed by `_isd_fingerprint()`, is `fingerprint`'''
+
+    self.isd_stats = ISDStatistics()
 
-      self._compute_dur_t(isd)
+    self.isd_stats.is_empty = len(fingerprint) == 0
 
-      self._compute_dur_d(isd)
+    if self.isd_stats.is_empty:
+      return self.isd_stats
 
-      self.isd_stats.dur = self.isd_stats.dur_t + self.isd_stats.dur_d
+    self.isd_stats.is_repeated = self._update_glyph_counts(fingerprint)
+
+    self.isd_stats.nbg_total, self.isd_stats.clear, self.isd_stats.dur_d = _compute_background(fingerprint)
+
+    self._compute_dur_t()
+
+    self.isd_stats.dur = self.isd_stats.dur_t + self.isd_stats.dur_d
 
     return self.isd_stats
 
-  def _compute_dur_d(
-    self,
-    isd: typing.Type[ttconv.isd.ISD]
-    ):
+  def _update_glyph_counts(self, fingerprint: typing.Tuple) -> bool:
+    '''Updates the glyph counts with those of the non-empty ISD whose fingerprint is `fingerprint`, and returns
+    whether the ISD is identical to the last non-empty ISD'''
 
-    self.isd_stats.is_empty = True
+    if fingerprint == self.fingerprint:
 
-    draw_area = 0
+      # the ISD is identical to the last non-empty ISD, whose glyphs are all in the back buffer
 
-    if isd is not None:
-      for region in isd.iter_regions():
+      self.fingerprint_hits += 1
 
-        if not _is_presented_region(region):
-          continue
+      return True
 
-        self.isd_stats.is_empty = False
+    self.fingerprint_misses += 1
 
-        nbg = 0
+    # glyphs are listed only for regions that were not present in the last non-empty ISD. The fingerprints of
+    # unchanged regions are reused, see `HRM._fingerprint()`, and are neither walked nor hashed again.
 
-        for element in region.dfs_iterator():
+    glyphs = []
 
-          # should body elements really be excluded? -> NO
-          # should transparent backgrounds really be counted? -> NO
-          # should span and br really be included -> yes for now
-          # should br really be included -> no
+    region_glyphs = {}
 
-          if isinstance(element, ttconv.model.Br):
-            continue
+    for region_fingerprint in fingerprint:
 
-          bg_color = element.get_style(styles.StyleProperties.BackgroundColor)
+      sequence = region_glyphs.get(region_fingerprint)
 
-          if bg_color is not None:
-            if bg_color.ident is not styles.ColorType.Colorimetry.RGBA8:
-              raise RuntimeError(f"Unsupported colorimetry system: {bg_color.ident}")
+      if sequence is None:
+        sequence = self.region_glyphs.get(region_fingerprint)
 
-            if bg_color.components[3] != 0:
-              nbg += 1
+      if sequence is None:
+        self.region_misses += 1
+        sequence = self._list_glyphs(region_fingerprint[2])
+      else:
+        self.region_hits += 1
 
-        draw_area += _region_normalized_size(region) * nbg
+      region_glyphs[region_fingerprint] = sequence
 
-        self.isd_stats.nbg_total += nbg
+      glyphs.extend(sequence)
 
-    draw_area += 0 if self.isd_stats.is_empty else 1
+    self.fingerprint = fingerprint
 
-    self.isd_stats.clear = draw_area != 0
+    self.glyphs = glyphs
 
-    self.isd_stats.dur_d = draw_area / _BDRAW
+    self.glyph_counts = collections.Counter(glyphs)
 
-  def _compute_dur_t(
-    self,
-    isd: typing.Type[ttconv.isd.ISD]
-    ):
+    self.region_glyphs = region_glyphs
+
+    return False
+
+  def _list_glyphs(self, text_runs: typing.Tuple) -> typing.Tuple[int, ...]:
+    '''Returns the glyphs of the `(glyph style, text)` tuples of `text_runs`, in order'''
+
+    glyphs = []
+
+    for glyph_style, text in text_runs:
+      style_key = self._glyph_style_id(glyph_style) << _CODEPOINT_BITS
+      glyphs.extend(style_key | codepoint for codepoint in map(ord, text))
+
+    return tuple(glyphs)
 
-    front_buffer = set()
+  def _compute_dur_t(self):
 
-    if isd is not None:
+    # the first occurrence of a glyph is copied from the back buffer if present there and rendered
+    # otherwise, and any subsequent occurrence is copied from the front buffer. The duration of each
+    # glyph is computed once per unique glyph.
 
-      for region in isd.iter_regions():
+    gcpys, ren_gs = _compute_divisors([glyph & _CODEPOINT_MASK for glyph in self.glyph_counts])
 
-        if not _is_presented_region(region):
-          continue
+    glyph_durs = {}
 
-        for element in region.dfs_iterator():
+    for (glyph, count), gcpy, ren_g in zip(self.glyph_counts.items(), gcpys, ren_gs):
 
-          if not isinstance(element, ttconv.model.Text):
-            continue
+      nrga = self.glyph_style_nrga[glyph >> _CODEPOINT_BITS]
 
-          parent = element.parent()
+      copy_dur = nrga / gcpy
 
-          nrga = _compute_nrga(element)
-          
-          for char in element.get_text():
+      self.isd_stats.ngra_t += nrga
 
-            glyph = _Glyph(
-              char=char,
-              color=parent.get_style(styles.StyleProperties.Color),
-              font_family=parent.get_style(styles.StyleProperties.FontFamily),
-              font_size=parent.get_style(styles.StyleProperties.FontSize),
-              font_style=parent.get_style(styles.StyleProperties.FontStyle),
-              font_weight=parent.get_style(styles.StyleProperties.FontWeight),
-              text_decoration=parent.get_style(styles.StyleProperties.TextDecoration),
-              text_outline=parent.get_style(styles.StyleProperties.TextOutline),
-              text_shadow=parent.get_style(styles.StyleProperties.TextShadow),
-              background_color=parent.get_style(styles.StyleProperties.BackgroundColor)
-            )
+      if glyph in self.back_buffer:
 
-            if glyph in front_buffer:
+        glyph_durs[glyph] = [copy_dur, copy_dur]
 
-              self.isd_stats.dur_t += nrga / _compute_gcpy(char)
+        self.isd_stats.gcpy_count += count
 
-              self.isd_stats.gcpy_count += 1
+      else:
 
-            elif glyph in self.back_buffer:
+        glyph_durs[glyph] = [nrga / ren_g, copy_dur]
 
-              self.isd_stats.dur_t += nrga / _compute_gcpy(char)
+        self.isd_stats.gren_count += 1
 
-              self.isd_stats.ngra_t += nrga
+        self.isd_stats.gcpy_count += count - 1
 
-              self.isd_stats.gcpy_count += 1
+    # the durations are summed one glyph at a time, in the order in which the glyphs are drawn, so that the
+    # rounding of the sum does not depend on the number of occurrences of each glyph
 
-            else:
-              
-              self.isd_stats.dur_t += nrga / _compute_ren_g(char)
+    dur_t = self.isd_stats.dur_t
 
-              self.isd_stats.ngra_t += nrga
+    for glyph in self.glyphs:
 
-              self.isd_stats.gren_count += 1
+      durs = glyph_durs[glyph]
 
-            front_buffer.add(glyph)
+      dur_t += durs[0]
 
-    self.back_buffer = front_buffer
+      # subsequent occurrences are copied from the front buffer
 
-def _compute_nrga(element: typing.Type[ttconv.model.Text]):
+      durs[0] = durs[1]
 
-  font_size: styles.LengthType = element.parent().get_style(styles.StyleProperties.FontSize)
+    self.isd_stats.dur_t = dur_t
+
+    self.back_buffer = set(self.glyph_counts)
+
+def _compute_background(fingerprint: typing.Tuple) -> typing.Tuple[Number, bool, Number]:
+  '''Returns the number of backgrounds drawn, whether the root container is cleared, and the background drawing
+  time of the non-empty ISD whose fingerprint is `fingerprint`'''
+
+  draw_area = 0
+
+  nbg_total = 0
+
+  for region_size, nbg, _ in fingerprint:
+
+    draw_area += region_size * nbg
+
+    nbg_total += nbg
+
+  # the root container is cleared, which is added last so that the rounding of the sum is unchanged
+
+  draw_area += 1
+
+  return (nbg_total, draw_area != 0, draw_area / _BDRAW)
+
+def _compute_nrga(font_size: styles.LengthType):
 
   if font_size.units is not styles.LengthType.Units.rh:
     raise RuntimeError(f"Unsupported fontSize units: {font_size.units}")
@@ -312,6 +520,35 @@ def _compute_gcpy(char: str):
 
   return _GCPY_BASE if ord(char) in GCPY_12 else _GCPY_OTHER
 
+def _compute_divisors(codepoints: typing.List[int]) -> typing.Tuple[typing.List[Number], typing.List[Number]]:
+  '''Returns the GCpy and Ren(G) values of each of `codepoints`'''
+
+  if numpy is None or len(codepoints) < _VECTORIZE_MIN_LENGTH:
+    return (
+      [_compute_gcpy(chr(codepoint)) for codepoint in codepoints],
+      [_compute_ren_g(chr(codepoint)) for codepoint in codepoints]
+    )
+
+  classes = _codepoint_classes()[numpy.array(codepoints, dtype=numpy.uint32)]
+
+  return (
+    numpy.where(classes & _GCPY_12_CLASS, _GCPY_BASE, _GCPY_OTHER).tolist(),
+    numpy.where(classes & _RENGI_06_CLASS, _REN_G_CJK, _REN_G_OTHER).tolist()
+  )
+
+@functools.lru_cache(maxsize=None)
+def _codepoint_classes():
+  '''Returns a numpy array that maps each Unicode codepoint to a combination of `_GCPY_12_CLASS` and
+  `_RENGI_06_CLASS` flags'''
+
+  classes = numpy.zeros(0x110000, dtype=numpy.uint8)
+
+  for codepoint_set, codepoint_class in ((GCPY_12, _GCPY_12_CLASS), (RENGI_06, _RENGI_06_CLASS)):
+    for i in range(0, len(codepoint_set.boundaries), 2):
+      classes[codepoint_set.boundaries[i]:codepoint_set.boundaries[i + 1]] |= codepoint_class
+
+  return classes
+
 def _region_normalized_size(region: typing.Type[ttconv.isd.ISD.Region]):
 
   region_extent: styles.ExtentType = region.get_style(styles.StyleProperties.Extent)
@@ -324,6 +561,68 @@ def _region_normalized_size(region: typing.Type[ttconv.isd.ISD.Region]):
 
   return region_extent.width.value * region_extent.height.value / 10000
 
+def _isd_fingerprint(isd: typing.Optional[ttconv.isd.ISD]) -> typing.Tuple:
+  '''Returns a structural fingerprint of `isd` that captures everything that determines its HRM
+  statistics, i.e. a tuple with one `(normalized size, background count, text runs)` tuple per presented
+  region, where `text runs` is a tuple of `(glyph style, text)` tuples. The fingerprint is empty if
+  the ISD is empty.'''
+
+  if isd is None:
+    return ()
+
+  return tuple(_region_fingerprint(region) for region in isd.iter_regions() if _is_presented_region(region))
+
+def _region_fingerprint(region: typing.Type[ttconv.isd.ISD.Region]) -> typing.Tuple:
+
+  nbg = 0
+
+  text_runs = []
+
+  for element in region.dfs_iterator():
+
+    # should body elements really be excluded? -> NO
+    # should transparent backgrounds really be counted? -> NO
+    # should span and br really be included -> yes for now
+    # should br really be included -> no
+
+    if isinstance(element, ttconv.model.Br):
+      continue
+
+    if isinstance(element, ttconv.model.Text):
+      parent = element.parent()
+      text_runs.append((tuple(parent.get_style(style_prop) for style_prop in _GLYPH_STYLE_PROPS), element.get_text()))
+      continue
+
+    bg_color = element.get_style(styles.StyleProperties.BackgroundColor)
+
+    if bg_color is not None:
+      if bg_color.ident is not styles.ColorType.Colorimetry.RGBA8:
+        raise RuntimeError(f"Unsupported colorimetry system: {bg_color.ident}")
+
+      if bg_color.components[3] != 0:
+        nbg += 1
+
+  return _RegionFingerprint((_region_normalized_size(region), nbg, tuple(text_runs)))
+
+class _RegionFingerprint(tuple):
+  '''Fingerprint of a region, as returned by `_region_fingerprint()`, whose hash is computed once. The fingerprint
+  of a region whose generation is unchanged is reused, and is therefore looked up in the glyph cache of the
+  HRM in constant time.'''
+
+  def __hash__(self):
+    try:
+      return self._hash
+    except AttributeError:
+      self._hash = tuple.__hash__(self) # pylint: disable=attribute-defined-outside-init
+      return self._hash
+
+  def __reduce__(self):
+    # the hash of strings differs across processes and is not pickled
+    return (_RegionFingerprint, (tuple(self),))
+
+def _is_empty_isd(isd: typing.Optional[ttconv.isd.ISD]):
+  return isd is None or not any(_is_presented_region(region) for region in isd.iter_regions())
+
 def _is_presented_region(region: typing.Type[ttconv.isd.ISD.Region]):
   '''See https://www.w3.org/TR/ttml-imsc1.1/#dfn-presented-region
   '''
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+'''Incremental validation of a sequence of documents, which reuses the results of a previous validation of
+the sequence for the documents that are unchanged'''
+
+__author__ = "agent <agent@local>"
+
+import mmap
+import os
+import pickle
+import tempfile
+import typing
+from dataclasses import dataclass
+from fractions import Fraction
+from numbers import Number
+
+import imschrm.doc_sequence
+import imschrm.hrm
+
+_RECORD_FORMAT_VERSION = 1
+
+DocumentKey = typing.Tuple[bytes, Fraction, typing.Optional[Fraction]]
+
+@dataclass
+class DocumentRecord:
+  stats: typing.List[typing.Tuple[Fraction, imschrm.hrm.ISDStatistics]] # Begin time and statistics of each ISD of the document
+  end_time: typing.Optional[Number] # Time at which the last ISD of the document ends
+  exit_state: typing.Optional[typing.Tuple] # State of the HRM after the last ISD of the document
+
+class ValidationRecord:
+  '''Record of the validation of a sequence of documents, which holds, for each document, the statistics of its ISDs
+  and the state of the HRM after its last ISD. Records are keyed by the contents and interval of the document, and by
+  the state of the HRM before its first ISD, so that a record applies to any identical document that is preceded by
+  an identical HRM state. `interval_tolerance` is the tolerance used when comparing document intervals.
+  '''
+
+  def __init__(self, interval_tolerance: Number = 0):
+    self.interval_tolerance = interval_tolerance
+    self.documents: typing.Dict[typing.Tuple[DocumentKey, typing.Optional[typing.Tuple]], DocumentRecord] = {}
+
+  def _versions(self) -> str:
+    return (
+      f"{_RECORD_FORMAT_VERSION} "
+      f"{imschrm.doc_sequence._package_version('ttconv')} "
+      f"{imschrm.doc_sequence._source_version()} "
+      f"{Fraction(self.interval_tolerance)}"
+    )
+
+  def save(self, path: str):
+    '''Writes the record to the file at `path`'''
+
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)), delete=False) as f:
+      try:
+        pickle.dump((self._versions(), self.documents), f, pickle.HIGHEST_PROTOCOL)
+      except BaseException:
+        f.close()
+        os.remove(f.name)
+        raise
+
+    os.replace(f.name, path)
+
+  @staticmethod
+  def load(path: str, interval_tolerance: Number = 0) -> typing.Optional["ValidationRecord"]:
+    '''Reads the record at `path`, and returns `None` if it does not exist or was created by other versions of
+    the software or with another `interval_tolerance`. Records are unpickled and must therefore be trusted.'''
+
+    record = ValidationRecord(interval_tolerance)
+
+    try:
+      with open(path, "rb") as f:
+        versions, documents = pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+      return None
+
+    if versions != record._versions():
+      return None
+
+    record.documents = documents
+
+    return record
+
+def _document_key(doc_begin: Number, doc_end: typing.Optional[Number], ttml_doc) -> DocumentKey:
+  return (
+    imschrm.doc_sequence._document_key(ttml_doc),
+    Fraction(doc_begin),
+    None if doc_end is None else Fraction(doc_end)
+  )
+
+def _iter_stats(
+  doc_iterator: imschrm.doc_sequence.DocumentIterator,
+  previous: typing.Optional[ValidationRecord],
+  record: ValidationRecord
+  ):
+  '''Returns the same sequence of ISD statistics as `imschrm.hrm._iter_stats(imschrm.doc_sequence.iter_isd(doc_iterator))`,
+  but reuses the statistics in `previous` where applicable, and records the statistics of each document in `record`'''
+
+  tolerance = record.interval_tolerance
+
+  hrm = imschrm.hrm.HRM()
+
+  # documents of the previous validation by document key, regardless of the HRM state that preceded them
+
+  previous_by_key = {} if previous is None else {key: doc_record for (key, _), doc_record in previous.documents.items()}
+
+  state = None
+
+  cur_time = None
+
+  for doc_begin, doc_end, ttml_doc in doc_iterator:
+
+    # the contents of file objects are needed to compute their hash
+
+    if not isinstance(ttml_doc, (str, bytes, bytearray, memoryview, mmap.mmap)):
+      ttml_doc = ttml_doc.read()
+
+    key = _document_key(doc_begin, doc_end, ttml_doc)
+
+    if cur_time is not None:
+
+      if cur_time - doc_begin > tolerance:
+
+        raise RuntimeError("Time intervals are overlapping.")
+
+      if doc_begin - cur_time > tolerance:
+
+        # insert a null ISD if there is a gap between documents
+
+        yield (cur_time, hrm.next_isd(None))
+
+    doc_record = None if previous is None else previous.documents.get((key, state))
+
+    if doc_record is not None:
+
+      # the document and the state of the HRM that precedes it are unchanged
+
+      yield from doc_record.stats
+
+    else:
+
+      doc_record = _evaluate_document(hrm, state, doc_begin, doc_end, ttml_doc, tolerance, previous_by_key.get(key))
+
+      yield from doc_record.stats
+
+    record.documents[(key, state)] = doc_record
+
+    state = doc_record.exit_state
+
+    cur_time = doc_record.end_time
+
+    if cur_time is None:
+      return
+
+def _evaluate_document(
+  hrm: imschrm.hrm.HRM,
+  state: typing.Optional[typing.Tuple],
+  doc_begin: Number,
+  doc_end: typing.Optional[Number],
+  ttml_doc,
+  tolerance: Number,
+  previous_record: typing.Optional[DocumentRecord]
+  ) -> DocumentRecord:
+  '''Evaluates the ISDs of a document starting from HRM state `state`. Since the state of the HRM after a non-empty
+  ISD depends only on that ISD, the statistics of the ISDs that follow the first non-empty ISD of the document are
+  taken from `previous_record`, if provided.'''
+
+  if hrm.fingerprint != state:
+    hrm.restore(state)
+
+  doc_stats = []
+
+  isd_iterator = imschrm.doc_sequence._iter_doc_isd(doc_begin, doc_end, ttml_doc, tolerance)
+
+  while True:
+
+    try:
+      time_offset, isd = next(isd_iterator)
+    except StopIteration as e:
+      return DocumentRecord(doc_stats, e.value, hrm.fingerprint)
+
+    stats = hrm.next_isd(isd)
+
+    doc_stats.append((time_offset, stats))
+
+    if previous_record is not None and not stats.is_empty:
+
+      isd_iterator.close()
+
+      doc_stats.extend(previous_record.stats[len(doc_stats):])
+
+      return DocumentRecord(doc_stats, previous_record.end_time, previous_record.exit_state)
+
+def validate_incremental(
+  doc_iterator: imschrm.doc_sequence.DocumentIterator,
+  previous: typing.Optional[ValidationRecord] = None,
+  event_handler: imschrm.hrm.EventHandler = imschrm.hrm.EventHandler(),
+  tolerance: float = 0,
+  interval_tolerance: Number = 0
+  ) -> ValidationRecord:
+  '''Validates the sequence of documents returned by `doc_iterator`, like
+  `imschrm.hrm.validate(imschrm.doc_sequence.iter_isd(doc_iterator, interval_tolerance), event_handler, tolerance)`,
+  and returns a record of the validation. If `previous`, a record of a previous validation, is provided, the
+  documents that are identical to documents of the previous validation are not processed again, and the ISDs of
+  a changed document are evaluated only until the first non-empty ISD that follows it. Events are identical to
+  those of a complete validation.
+  '''
+
+  record = ValidationRecord(interval_tolerance)
+
+  if previous is not None and previous.interval_tolerance != interval_tolerance:
+    previous = None
+
+  imschrm.hrm.validate_stats(_iter_stats(doc_iterator, previous, record), event_handler, tolerance)
+
+  return record
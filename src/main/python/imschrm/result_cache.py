@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+'''Cache of validation results, which allows unchanged inputs to be reported without being validated again'''
+
+__author__ = "agent <agent@local>"
+
+import hashlib
+import mmap
+import os
+import pickle
+import tempfile
+import typing
+from fractions import Fraction
+from numbers import Number
+
+import imschrm.doc_sequence
+import imschrm.hrm
+
+_CACHE_FORMAT_VERSION = 1
+
+Event = typing.Tuple[str, str, int, Fraction, Fraction, imschrm.hrm.ISDStatistics]
+
+class RecordingEventHandler(imschrm.hrm.EventHandler):
+  '''Forwards events to `event_handler` and records them so that they can be replayed'''
+
+  def __init__(self, event_handler: imschrm.hrm.EventHandler):
+    self.event_handler = event_handler
+    self.events: typing.List[Event] = []
+
+  def info(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.events.append(("info", msg, doc_index, time_offset, available_time, stats))
+    self.event_handler.info(msg, doc_index, time_offset, available_time, stats)
+
+  def warn(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.events.append(("warn", msg, doc_index, time_offset, available_time, stats))
+    self.event_handler.warn(msg, doc_index, time_offset, available_time, stats)
+
+  def error(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.events.append(("error", msg, doc_index, time_offset, available_time, stats))
+    self.event_handler.error(msg, doc_index, time_offset, available_time, stats)
+
+  def debug(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.events.append(("debug", msg, doc_index, time_offset, available_time, stats))
+    self.event_handler.debug(msg, doc_index, time_offset, available_time, stats)
+
+def replay(events: typing.Iterable[Event], event_handler: imschrm.hrm.EventHandler):
+  '''Emits the recorded `events` to `event_handler`, in order'''
+
+  for method, *args in events:
+    getattr(event_handler, method)(*args)
+
+class ResultCache:
+  '''Persistent cache of the events emitted while validating inputs, stored as one file per input in `directory`.
+  Entries are keyed by the validation tolerance, the version of ttconv, the sources of imschrm and either the
+  path, size and modification time of the files of an input (see `file_key()`) or, if `hash_contents` is true, the
+  contents and intervals of its documents (see `input_key()`). `hits` and `misses` count the inputs that were and
+  were not found in the cache, respectively. Cache files are unpickled and the directory must therefore be trusted.
+  '''
+
+  def __init__(self, directory: str, hash_contents: bool = False):
+    self.directory = directory
+    self.hash_contents = hash_contents
+    self.hits = 0
+    self.misses = 0
+
+    os.makedirs(directory, exist_ok=True)
+
+  @staticmethod
+  def _new_hash(tolerance: Number):
+    h = hashlib.blake2b(digest_size=16)
+
+    h.update(
+      f"{_CACHE_FORMAT_VERSION} "
+      f"{imschrm.doc_sequence._package_version('ttconv')} "
+      f"{imschrm.doc_sequence._source_version()} "
+      f"{Fraction(tolerance)}\n".encode("utf-8")
+    )
+
+    return h
+
+  @staticmethod
+  def file_key(paths: typing.Iterable[str], tolerance: Number = 0) -> bytes:
+    '''Returns the key of the input consisting of the files at `paths`, e.g. a manifest and the documents it lists,
+    validated with tolerance `tolerance`. The key depends on the path, size and modification time of each file,
+    which is not read.'''
+
+    h = ResultCache._new_hash(tolerance)
+
+    for path in paths:
+      st = os.stat(path)
+
+      h.update(f"{len(path)} {path} {st.st_size} {st.st_mtime_ns}\n".encode("utf-8"))
+
+    return h.digest()
+
+  @staticmethod
+  def input_key(doc_sequence: imschrm.doc_sequence.DocumentIterator, tolerance: Number = 0) -> bytes:
+    '''Returns the key of the input consisting of the documents of `doc_sequence`, which are read in the process,
+    and validated with tolerance `tolerance`'''
+
+    h = ResultCache._new_hash(tolerance)
+
+    for begin, end, ttml_doc in doc_sequence:
+      if hasattr(ttml_doc, "read") and not isinstance(ttml_doc, mmap.mmap):
+        ttml_doc = ttml_doc.read()
+
+      h.update(f"{Fraction(begin)} {None if end is None else Fraction(end)} ".encode("utf-8"))
+      h.update(imschrm.doc_sequence._document_key(ttml_doc))
+
+    return h.digest()
+
+  def _path(self, key: bytes) -> str:
+    return os.path.join(self.directory, key.hex() + ".result")
+
+  def load(self, key: bytes) -> typing.Optional[typing.List[Event]]:
+    '''Returns the events recorded for the input with key `key`, or `None` if it is not in the cache'''
+
+    try:
+      with open(self._path(key), "rb") as f:
+        events = pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+      self.misses += 1
+      return None
+
+    self.hits += 1
+
+    return events
+
+  def store(self, key: bytes, events: typing.List[Event]):
+    '''Stores the events `events` recorded for the input with key `key`'''
+
+    with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as f:
+      try:
+        pickle.dump(events, f, pickle.HIGHEST_PROTOCOL)
+      except BaseException:
+        f.close()
+        os.remove(f.name)
+        raise
+
+    # readers never see incomplete files
+
+    os.replace(f.name, self._path(key))
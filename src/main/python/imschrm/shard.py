@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Validation of a sequence of documents split into contiguous shards, which are validated independently, e.g. on
+separate nodes, and whose results are merged into those of a validation of the complete sequence. A single document
+can similarly be split into contiguous time shards that are validated in parallel.'''
+
+__author__ = "agent <agent@local>"
+
+import concurrent.futures
+import itertools
+import multiprocessing
+import typing
+from dataclasses import dataclass, field
+from fractions import Fraction
+from numbers import Number
+
+import imschrm.checkpoint
+import imschrm.doc_sequence
+import imschrm.hrm
+import imschrm.result_cache
+import ttconv.isd
+import ttconv.model
+from imschrm.state import HRMState
+
+@dataclass
+class Shard:
+  '''Documents at positions `[begin, end)` of a sequence. The validation of the shard starts in the state
+  `start_state`, serialized by `HRMState.to_bytes()`, which follows the last non-empty ISD that precedes the shard,
+  and `prev_end_time` is the time at which the document that precedes the shard ends. Both are `None` for the first
+  shard of the sequence.'''
+
+  begin: int
+  end: int
+  start_state: typing.Optional[bytes] = None
+  prev_end_time: typing.Optional[Number] = None
+
+@dataclass
+class ShardResult:
+  '''Result of the validation of a shard: the events signalled for its ISDs, whose indices start at 0 at the
+  first ISD of the shard, the number of ISDs of the shard, the states that precede and follow them, the time at
+  which its last ISD ends, and whether the sequence ended within the shard. States are serialized by
+  `HRMState.to_bytes()`.'''
+
+  events: typing.List[imschrm.result_cache.Event] = field(default_factory=list)
+  isd_count: int = 0
+  start_state: typing.Optional[bytes] = None
+  end_state: typing.Optional[bytes] = None
+  end_time: typing.Optional[Number] = None
+  ended: bool = False
+
+def _list_doc_isds(doc_begin, doc_end, ttml_doc, interval_tolerance):
+  '''Returns the `(begin, ISD)` tuples of a document, and the time at which its last ISD ends'''
+
+  isds = []
+
+  isd_iterator = imschrm.doc_sequence.iter_isd(iter([(doc_begin, doc_end, ttml_doc)]), interval_tolerance)
+
+  while True:
+    try:
+      isds.append(next(isd_iterator))
+    except StopIteration as e:
+      return (isds, e.value)
+
+def _make_shard(
+  documents: typing.Sequence[typing.Tuple[Number, typing.Optional[Number], imschrm.doc_sequence.Document]],
+  begin: int,
+  end: int,
+  interval_tolerance: Number
+  ) -> Shard:
+
+  if begin == 0:
+    return Shard(begin, end)
+
+  shard = Shard(begin, end, HRMState().to_bytes())
+
+  # the documents that precede the shard are searched, most recent first, for the last non-empty ISD, which
+  # determines the state in which the shard starts
+
+  for doc_position in range(begin - 1, -1, -1):
+
+    isds, doc_end_time = _list_doc_isds(*documents[doc_position], interval_tolerance)
+
+    if doc_position == begin - 1:
+      shard.prev_end_time = doc_end_time
+
+    for time_offset, isd in reversed(isds):
+
+      hrm = imschrm.hrm.HRM()
+
+      if not hrm.next_isd(isd).is_empty:
+        shard.start_state = HRMState.from_hrm(hrm, time_offset).to_bytes()
+        return shard
+
+  return shard
+
+def make_shards(
+  documents: typing.Sequence[typing.Tuple[Number, typing.Optional[Number], imschrm.doc_sequence.Document]],
+  shard_count: int,
+  interval_tolerance: Number = 0
+  ) -> typing.List[Shard]:
+  '''Splits the sequence of `(begin, end, doc)` tuples `documents`, e.g. the entries of a manifest, into at most
+  `shard_count` contiguous shards with similar numbers of documents, which can be validated independently. The
+  state in which each shard starts is determined by the last non-empty ISD of the documents that precede it, and
+  only the documents that are searched for that ISD, i.e. those that immediately precede each shard, are parsed.
+  Documents should therefore be strings or bytes-like objects, which can be read more than once. Alternatively,
+  each shard can be started from the state in which its predecessor ends, see `next_shard()`.'''
+
+  shard_count = min(shard_count, len(documents))
+
+  boundaries = [len(documents) * i // shard_count for i in range(shard_count + 1)]
+
+  return [
+    _make_shard(documents, begin, end, interval_tolerance)
+    for begin, end in zip(boundaries, boundaries[1:])
+  ]
+
+def next_shard(result: ShardResult, begin: int, end: int) -> Shard:
+  '''Returns the shard of the documents at positions `[begin, end)` that immediately follows the shard whose
+  validation resulted in `result`, and which starts in the state in which `result` ends'''
+
+  return Shard(begin, end, result.end_state, result.end_time)
+
+class _ShardTracker(imschrm.hrm.EventHandler):
+  '''Tracks the validation of a shard and records the events signalled for its ISDs. Stands in for the checkpoint
+  writer of `imschrm.checkpoint.iter_stats()`, which reports the HRM before each document and each ISD.'''
+
+  def __init__(self, start_state: HRMState):
+    self.start_state = start_state
+    self.hrm = None
+    self.result = ShardResult(start_state=start_state.to_bytes())
+
+  def update(self, hrm: imschrm.hrm.HRM, **kwargs):
+    self.hrm = hrm
+
+  def _record(self, method: str, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self.result.events.append((method, msg, doc_index, time_offset, available_time, stats))
+
+  def info(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self._record("info", msg, doc_index, time_offset, available_time, stats)
+
+  def warn(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self._record("warn", msg, doc_index, time_offset, available_time, stats)
+
+  def error(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self._record("error", msg, doc_index, time_offset, available_time, stats)
+
+  def debug(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: imschrm.hrm.ISDStatistics):
+    self._record("debug", msg, doc_index, time_offset, available_time, stats)
+
+  def iter_stats(self, stats_iterator):
+    '''Returns the statistics of `stats_iterator`, and records the state that follows them'''
+
+    last_render_time = self.start_state.last_render_time
+
+    while True:
+
+      try:
+        time_offset, stats = next(stats_iterator)
+      except StopIteration as e:
+        self.result.end_time = e.value
+        self.result.ended = e.value is None
+        break
+
+      yield (time_offset, stats)
+
+      self.result.isd_count += 1
+
+      if not stats.is_empty:
+        last_render_time = time_offset
+
+    if self.hrm is None:
+      self.result.end_state = self.result.start_state
+    else:
+      self.result.end_state = HRMState.from_hrm(self.hrm, last_render_time).to_bytes()
+
+def validate_shard(
+  doc_iterator: imschrm.doc_sequence.DocumentIterator,
+  shard: Shard,
+  tolerance: float = 0,
+  interval_tolerance: Number = 0
+  ) -> ShardResult:
+  '''Validates `shard`, whose documents are returned by `doc_iterator`, starting in the state of the shard. The
+  documents that precede the shard are neither read nor parsed.'''
+
+  start_state = HRMState() if shard.start_state is None else HRMState.from_bytes(shard.start_state)
+
+  start = imschrm.checkpoint.Checkpoint(
+    prev_end_time=shard.prev_end_time,
+    hrm_state=start_state.fingerprint,
+    last_render_time=start_state.last_render_time
+  )
+
+  tracker = _ShardTracker(start_state)
+
+  imschrm.hrm.validate_stats(
+    tracker.iter_stats(imschrm.checkpoint.iter_stats(doc_iterator, start, tracker, interval_tolerance)),
+    tracker,
+    tolerance,
+    start_state.last_render_time
+  )
+
+  return tracker.result
+
+def merge_shard_results(
+  results: typing.Iterable[ShardResult],
+  event_handler: imschrm.hrm.EventHandler = imschrm.hrm.EventHandler()
+  ):
+  '''Signals to `event_handler` the events of the results of the validation of consecutive shards, in order, as
+  they would have been signalled by the validation of the complete sequence'''
+
+  isd_index = 0
+
+  end_state = HRMState().to_bytes()
+
+  for result in results:
+
+    if result.start_state != end_state:
+      raise RuntimeError("The shard does not continue the validation of its predecessor")
+
+    for method, msg, doc_index, *args in result.events:
+      getattr(event_handler, method)(msg, doc_index + isd_index, *args)
+
+    if result.ended:
+      return
+
+    isd_index += result.isd_count
+
+    end_state = result.end_state
+
+# time shards are generated by the internal document processing of `imschrm.doc_sequence`
+
+# pylint: disable=protected-access
+
+def _plan_isds(
+  doc_begin: Number,
+  doc_end: typing.Optional[Number],
+  interval_tolerance: Number,
+  offsets: typing.Tuple[Number, ...]
+  ) -> typing.Tuple[typing.List[typing.Tuple[Number, int]], typing.Optional[Number]]:
+  '''Returns the `(begin, position of the significant time)` tuples of the ISDs of a document, which depend on its
+  significant times only, and the time at which its last ISD ends'''
+
+  plan = []
+
+  isd_iterator = imschrm.doc_sequence._iter_window_isd(
+    doc_begin,
+    doc_end,
+    interval_tolerance,
+    offsets,
+    lambda start, end: lambda offset: None,
+    with_positions=True
+  )
+
+  while True:
+    try:
+      time_offset, sig_time_position, _ = next(isd_iterator)
+    except StopIteration as e:
+      return (plan, e.value)
+
+    plan.append((time_offset, sig_time_position))
+
+# data model and significant times of the document split into time shards, which are set in each worker process
+
+_worker_document: typing.Optional[typing.Tuple[ttconv.model.ContentDocument, ttconv.isd.SignificantTimes]] = None
+
+def _init_time_shard_worker(document: typing.Tuple[ttconv.model.ContentDocument, ttconv.isd.SignificantTimes]):
+  global _worker_document # pylint: disable=global-statement
+
+  _worker_document = document
+
+def _evaluate_time_shard(
+  ttml_doc: typing.Optional[imschrm.doc_sequence.Document],
+  doc_begin: Number,
+  doc_end: typing.Optional[Number],
+  interval_tolerance: Number,
+  shard_index: int,
+  shard_count: int
+  ) -> typing.Tuple[typing.List[typing.Tuple[Number, imschrm.hrm.ISDStatistics]], typing.Optional[Number]]:
+  '''Returns the statistics of the ISDs of time shard `shard_index` of `shard_count` of the document `ttml_doc`,
+  or of the document set by `_init_time_shard_worker()` if `ttml_doc` is `None`, and the time at which the last
+  ISD of the document ends'''
+
+  if ttml_doc is None:
+    m, sig_times = _worker_document
+  else:
+    m = imschrm.doc_sequence._to_model(ttml_doc)
+    sig_times = ttconv.isd.ISD.significant_times(m)
+
+  plan, end_time = _plan_isds(doc_begin, doc_end, interval_tolerance, sig_times.offsets())
+
+  first = len(plan) * shard_index // shard_count
+
+  last = len(plan) * (shard_index + 1) // shard_count
+
+  if first == last:
+    return ([], end_time)
+
+  hrm = imschrm.hrm.HRM()
+
+  # the HRM is seeded with the last non-empty ISD that precedes the shard, which is generated from the
+  # unmodified document before the shard is swept
+
+  for _, sig_time_position in reversed(plan[:first]):
+
+    seeded_hrm = imschrm.hrm.HRM()
+
+    if not seeded_hrm.next_isd(ttconv.isd.ISD.from_model(m, sig_times.offsets()[sig_time_position], sig_times)).is_empty:
+      hrm = seeded_hrm
+      break
+
+  sweep = None
+
+  def _make_sweep(start, end):
+    nonlocal sweep
+    sweep = imschrm.doc_sequence._TimelineSweep(m, sig_times, start, end)
+    return sweep.isd_at
+
+  isd_iterator = imschrm.doc_sequence._iter_window_isd(
+    plan[first][0],
+    doc_end,
+    interval_tolerance,
+    sig_times.offsets(),
+    _make_sweep,
+    plan[first][1]
+  )
+
+  try:
+    return ([(time_offset, hrm.next_isd(isd)) for time_offset, isd in itertools.islice(isd_iterator, last - first)], end_time)
+  finally:
+    # the document set by `_init_time_shard_worker()` is reused by the other shards evaluated by the process
+    if sweep is not None and ttml_doc is None:
+      sweep.restore()
+
+def iter_stats_time_sharded(
+  ttml_doc: imschrm.doc_sequence.Document,
+  shard_count: int,
+  doc_begin: Number = 0,
+  doc_end: typing.Optional[Number] = None,
+  interval_tolerance: Number = 0
+  ):
+  '''Returns the same `(begin, ISD statistics)` sequence as the HRM evaluation of the ISDs of the TTML document
+  `ttml_doc` active in the interval `[doc_begin, doc_end)`, and the time at which the last ISD ends. The ISDs are
+  split into `shard_count` contiguous time shards, which are generated and evaluated in parallel by as many processes,
+  and the HRM of each shard is seeded with the last non-empty ISD that precedes the shard. The document is parsed
+  once if processes can be forked, and by each process otherwise.'''
+
+  if "fork" in multiprocessing.get_all_start_methods():
+
+    # data models cannot be pickled, but forked processes inherit the arguments of their initializer
+
+    m = imschrm.doc_sequence._to_model(ttml_doc)
+
+    executor = concurrent.futures.ProcessPoolExecutor(
+      shard_count,
+      mp_context=multiprocessing.get_context("fork"),
+      initializer=_init_time_shard_worker,
+      initargs=((m, ttconv.isd.ISD.significant_times(m)),)
+    )
+
+    ttml_doc = None
+
+  else:
+    executor = concurrent.futures.ProcessPoolExecutor(shard_count)
+
+    ttml_doc = imschrm.doc_sequence._to_picklable_document(ttml_doc)
+
+  end_time = None
+
+  with executor:
+
+    shards = [
+      executor.submit(_evaluate_time_shard, ttml_doc, doc_begin, doc_end, interval_tolerance, shard_index, shard_count)
+      for shard_index in range(shard_count)
+    ]
+
+    for shard in shards:
+      shard_stats, end_time = shard.result()
+      yield from shard_stats
+
+  return end_time
+
+def validate_time_sharded(
+  ttml_doc: imschrm.doc_sequence.Document,
+  event_handler: imschrm.hrm.EventHandler = imschrm.hrm.EventHandler(),
+  tolerance: float = 0,
+  shard_count: int = 2,
+  doc_begin: Number = 0,
+  doc_end: typing.Optional[Number] = None,
+  interval_tolerance: Number = 0
+  ):
+  '''Validates the TTML document `ttml_doc` active in the interval `[doc_begin, doc_end)`, like
+  `imschrm.hrm.validate(imschrm.doc_sequence.iter_isd([(doc_begin, doc_end, ttml_doc)], interval_tolerance), event_handler, tolerance)`,
+  using `shard_count` processes. See `iter_stats_time_sharded()`.'''
+
+  imschrm.hrm.validate_stats(
+    iter_stats_time_sharded(ttml_doc, shard_count, doc_begin, doc_end, interval_tolerance),
+    event_handler,
+    tolerance
+  )
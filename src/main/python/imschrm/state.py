@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+'''Serialization of the state of the HRM, which allows a validation to be continued on another node'''
+
+__author__ = "agent <agent@local>"
+
+import dataclasses
+import enum
+import struct
+import typing
+from dataclasses import dataclass
+from fractions import Fraction
+from numbers import Number
+
+import ttconv.style_properties as styles
+
+import imschrm.hrm
+
+_MAGIC = b"IHRM"
+
+_STATE_FORMAT_VERSION = 1
+
+# tags of the encoded values
+
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FRACTION = 4
+_FLOAT = 5
+_STR = 6
+_TUPLE = 7
+_ENUM = 8
+_DATACLASS = 9
+
+_FLOAT_STRUCT = struct.Struct(">d")
+
+@dataclass
+class HRMState:
+  '''State of a validation that is carried from one ISD to the next: the fingerprint of the last non-empty ISD,
+  which determines the state of the HRM (see `imschrm.hrm.HRM.restore()`), and the begin time of that ISD'''
+
+  fingerprint: typing.Optional[typing.Tuple] = None
+  last_render_time: Number = -imschrm.hrm._IPD
+
+  @staticmethod
+  def from_hrm(hrm: imschrm.hrm.HRM, last_render_time: Number) -> "HRMState":
+    '''Returns the state of `hrm`, whose last non-empty ISD began at `last_render_time`'''
+    return HRMState(hrm.fingerprint, last_render_time)
+
+  def to_hrm(self) -> imschrm.hrm.HRM:
+    '''Returns an HRM in this state'''
+    hrm = imschrm.hrm.HRM()
+    hrm.restore(self.fingerprint)
+    return hrm
+
+  def to_bytes(self) -> bytes:
+    '''Returns the versioned binary representation of the state. Glyph styles are stored once, and referenced by
+    the text runs that use them.'''
+
+    glyph_styles = {}
+
+    regions = None
+
+    if self.fingerprint is not None:
+      regions = tuple(
+        (size, nbg, tuple((glyph_styles.setdefault(glyph_style, len(glyph_styles)), text) for glyph_style, text in text_runs))
+        for size, nbg, text_runs in self.fingerprint
+      )
+
+    buffer = bytearray(_MAGIC)
+
+    buffer.append(_STATE_FORMAT_VERSION)
+
+    _encode((self.last_render_time, tuple(glyph_styles), regions), buffer)
+
+    return bytes(buffer)
+
+  @staticmethod
+  def from_bytes(data: bytes) -> "HRMState":
+    '''Returns the state represented by `data`, as returned by `HRMState.to_bytes()`. Raises `ValueError` if
+    `data` is not a valid representation of a state.'''
+
+    data = memoryview(data)
+
+    if bytes(data[:len(_MAGIC)]) != _MAGIC:
+      raise ValueError("Not an HRM state")
+
+    if len(data) <= len(_MAGIC) or data[len(_MAGIC)] != _STATE_FORMAT_VERSION:
+      raise ValueError("Unsupported HRM state version")
+
+    try:
+      value, offset = _decode(data, len(_MAGIC) + 1)
+      last_render_time, glyph_styles, regions = value
+    except (IndexError, TypeError, struct.error, UnicodeDecodeError) as e:
+      raise ValueError("Malformed HRM state") from e
+
+    if offset != len(data):
+      raise ValueError("Malformed HRM state")
+
+    fingerprint = None
+
+    if regions is not None:
+      fingerprint = tuple(
+        (size, nbg, tuple((glyph_styles[style_index], text) for style_index, text in text_runs))
+        for size, nbg, text_runs in regions
+      )
+
+    return HRMState(fingerprint, last_render_time)
+
+def _encode_uint(value: int, buffer: bytearray):
+  while value > 0x7F:
+    buffer.append(0x80 | (value & 0x7F))
+    value >>= 7
+
+  buffer.append(value)
+
+def _encode_int(value: int, buffer: bytearray):
+  _encode_uint(value << 1 if value >= 0 else ((-value) << 1) - 1, buffer)
+
+def _encode_str(value: str, buffer: bytearray):
+  encoded = value.encode("utf-8", "surrogatepass")
+  _encode_uint(len(encoded), buffer)
+  buffer += encoded
+
+def _encode(value, buffer: bytearray):
+  '''Appends the encoding of `value`, which consists of numbers, strings, tuples, and style values, to `buffer`'''
+
+  if value is None:
+    buffer.append(_NONE)
+
+  elif isinstance(value, bool):
+    buffer.append(_TRUE if value else _FALSE)
+
+  elif isinstance(value, int):
+    buffer.append(_INT)
+    _encode_int(value, buffer)
+
+  elif isinstance(value, Fraction):
+    buffer.append(_FRACTION)
+    _encode_int(value.numerator, buffer)
+    _encode_uint(value.denominator, buffer)
+
+  elif isinstance(value, float):
+    buffer.append(_FLOAT)
+    buffer += _FLOAT_STRUCT.pack(value)
+
+  elif isinstance(value, str):
+    buffer.append(_STR)
+    _encode_str(value, buffer)
+
+  elif isinstance(value, tuple):
+    buffer.append(_TUPLE)
+    _encode_uint(len(value), buffer)
+    for item in value:
+      _encode(item, buffer)
+
+  elif isinstance(value, enum.Enum) and type(value).__module__ == styles.__name__:
+    buffer.append(_ENUM)
+    _encode_str(type(value).__qualname__, buffer)
+    _encode_str(value.name, buffer)
+
+  elif dataclasses.is_dataclass(value) and type(value).__module__ == styles.__name__:
+    buffer.append(_DATACLASS)
+    _encode_str(type(value).__qualname__, buffer)
+    fields = dataclasses.fields(value)
+    _encode_uint(len(fields), buffer)
+    for field in fields:
+      _encode(getattr(value, field.name), buffer)
+
+  else:
+    raise ValueError(f"Unsupported value in HRM state: {value!r}")
+
+def _decode_uint(data: memoryview, offset: int) -> typing.Tuple[int, int]:
+  value = 0
+  shift = 0
+
+  while True:
+    byte = data[offset]
+    offset += 1
+    value |= (byte & 0x7F) << shift
+    shift += 7
+
+    if byte & 0x80 == 0:
+      return (value, offset)
+
+def _decode_int(data: memoryview, offset: int) -> typing.Tuple[int, int]:
+  value, offset = _decode_uint(data, offset)
+  return ((value >> 1) if value & 1 == 0 else -((value + 1) >> 1), offset)
+
+def _decode_str(data: memoryview, offset: int) -> typing.Tuple[str, int]:
+  length, offset = _decode_uint(data, offset)
+
+  if offset + length > len(data):
+    raise IndexError("Truncated string")
+
+  return (bytes(data[offset:offset + length]).decode("utf-8", "surrogatepass"), offset + length)
+
+def _style_type(qualname: str) -> type:
+  '''Returns the type of style value named `qualname`, which is defined in `ttconv.style_properties`'''
+
+  value_type = styles
+
+  for name in qualname.split("."):
+    value_type = getattr(value_type, name, None)
+
+  if not isinstance(value_type, type) or value_type.__module__ != styles.__name__:
+    raise ValueError(f"Unknown style value type: {qualname}")
+
+  return value_type
+
+def _decode(data: memoryview, offset: int) -> typing.Tuple[typing.Any, int]:
+  '''Returns the value encoded at `offset` in `data`, and the offset that follows it'''
+
+  tag = data[offset]
+  offset += 1
+
+  if tag == _NONE:
+    return (None, offset)
+
+  if tag in (_FALSE, _TRUE):
+    return (tag == _TRUE, offset)
+
+  if tag == _INT:
+    return _decode_int(data, offset)
+
+  if tag == _FRACTION:
+    numerator, offset = _decode_int(data, offset)
+    denominator, offset = _decode_uint(data, offset)
+    return (Fraction(numerator, denominator), offset)
+
+  if tag == _FLOAT:
+    return (_FLOAT_STRUCT.unpack_from(data, offset)[0], offset + _FLOAT_STRUCT.size)
+
+  if tag == _STR:
+    return _decode_str(data, offset)
+
+  if tag == _TUPLE:
+    length, offset = _decode_uint(data, offset)
+    items = []
+    for _ in range(length):
+      item, offset = _decode(data, offset)
+      items.append(item)
+    return (tuple(items), offset)
+
+  if tag == _ENUM:
+    qualname, offset = _decode_str(data, offset)
+    name, offset = _decode_str(data, offset)
+    value_type = _style_type(qualname)
+    if not issubclass(value_type, enum.Enum) or name not in value_type.__members__:
+      raise ValueError(f"Unknown style value: {qualname}.{name}")
+    return (value_type[name], offset)
+
+  if tag == _DATACLASS:
+    qualname, offset = _decode_str(data, offset)
+    length, offset = _decode_uint(data, offset)
+    value_type = _style_type(qualname)
+    if not dataclasses.is_dataclass(value_type):
+      raise ValueError(f"Unknown style value type: {qualname}")
+    fields = []
+    for _ in range(length):
+      field, offset = _decode(data, offset)
+      fields.append(field)
+    return (value_type(*fields), offset)
+
+  raise ValueError(f"Unknown tag in HRM state: {tag}")
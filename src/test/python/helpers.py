@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Documents and validation helpers shared by the unit tests"""
+
+__author__ = "agent <agent@local>"
+
+# pylint: disable=R0201,C0115,C0116,W0212
+import imschrm.doc_sequence
+import imschrm.hrm as hrm
+from imschrm.result_cache import RecordingEventHandler
+
+def make_doc(begin, *texts):
+  '''Returns a document that presents each of `texts` in turn for one second, starting at `begin` seconds, and
+  ends after the last one. Empty texts result in empty ISDs.'''
+
+  ps = "".join(f'<p begin="{begin + i}s" end="{begin + i + 1}s">{text}</p>' for i, text in enumerate(texts) if text)
+
+  return f'''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en" xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <body end="{begin + len(texts)}s">
+    <div>{ps}</div>
+  </body>
+</tt>'''
+
+def validate(docs, max_workers=1):
+  '''Returns the events signalled by the validation of the sequence of documents `docs`'''
+
+  ev = RecordingEventHandler(hrm.EventHandler())
+  hrm.validate(imschrm.doc_sequence.iter_isd(docs), ev, max_workers=max_workers)
+  return ev.events
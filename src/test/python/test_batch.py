@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Unit tests for the batch HRM engine"""
+
+__author__ = "agent <agent@local>"
+
+# pylint: disable=R0201,C0115,C0116,W0212
+import unittest
+
+import imschrm.batch as batch
+import imschrm.doc_sequence
+import imschrm.hrm as hrm
+from imschrm.result_cache import RecordingEventHandler
+
+from .helpers import make_doc, validate
+
+DOC = make_doc(
+  0,
+  "hello",
+  "hello",
+  "",
+  "hello world",
+  '<span tts:color="red">hello</span> world',
+  '<span tts:fontSize="200%">big</span> world',
+  "".join(chr(0x4E00 + i) for i in range(200)),
+  "".join(chr(0x4E00 + i) for i in range(100)) + "abc",
+  "",
+  "",
+  "abc"
+)
+
+@unittest.skipIf(batch.numpy is None, "numpy is not available")
+class BatchTests(unittest.TestCase):
+
+  def test_stats(self):
+    h = hrm.HRM()
+
+    expected = [(time_offset, h.next_isd(isd)) for time_offset, isd in imschrm.doc_sequence.iter_isd([(0, None, DOC)])]
+
+    offsets, stats = batch.evaluate_isds(imschrm.doc_sequence.iter_isd([(0, None, DOC)]))
+
+    self.assertEqual(stats.dtype.names, tuple(hrm.ISDStatistics.__dataclass_fields__))
+
+    self.assertEqual(offsets, [time_offset for time_offset, _ in expected])
+
+    self.assertTrue(stats["is_repeated"][1])
+
+    for (_, expected_stats), (_, isd_stats) in zip(expected, batch.iter_stats(offsets, stats)):
+      self.assertEqual(isd_stats, expected_stats)
+
+  def test_stats_regions(self):
+
+    # glyphs shared by regions are first drawn in the first region, and the durations of the glyphs are summed
+    # in the order in which they are drawn, as by the scalar engine
+
+    ps = "".join(
+      f'<p region="r{i % 3 + 1}" begin="{i / 2}s" end="{i / 2 + 2}s">{text}</p>'
+      for i, text in enumerate(("hello", "world " * 7, "".join(chr(0x4E00 + i) for i in range(30)), "hello abc", "abc"))
+    )
+
+    doc = f'''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en" xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <head>
+    <layout>
+      <region xml:id="r1" tts:extent="100% 30%"/>
+      <region xml:id="r2" tts:origin="0% 35%" tts:extent="100% 30%" tts:backgroundColor="black"/>
+      <region xml:id="r3" tts:origin="0% 70%" tts:extent="100% 30%" tts:fontSize="150%"/>
+    </layout>
+  </head>
+  <body>
+    <div>{ps}</div>
+  </body>
+</tt>'''
+
+    h = hrm.HRM()
+
+    expected = [h.next_isd(isd) for _, isd in imschrm.doc_sequence.iter_isd([(0, None, doc)])]
+
+    self.assertEqual([isd_stats for _, isd_stats in batch.iter_stats(*batch.evaluate_isds(imschrm.doc_sequence.iter_isd([(0, None, doc)])))], expected)
+
+  def test_validate(self):
+    for docs in ([(0, None, DOC)], []):
+      with self.subTest(docs=docs):
+        ev = RecordingEventHandler(hrm.EventHandler())
+        batch.validate(imschrm.doc_sequence.iter_isd(docs), ev)
+
+        self.assertEqual(ev.events, validate(docs))
+
+        if len(docs) > 0:
+          self.assertIn("Rendering time exceeded", (event[1] for event in ev.events))
+
+  def test_file(self):
+    with open("src/test/resources/ttml/fail001.ttml", "rb") as f:
+      doc = f.read()
+
+    ev = RecordingEventHandler(hrm.EventHandler())
+    batch.validate(imschrm.doc_sequence.iter_isd([(0, None, doc)]), ev)
+
+    self.assertEqual(ev.events, validate([(0, None, doc)]))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Unit tests for checkpointed validation"""
+
+__author__ = "agent <agent@local>"
+
+# pylint: disable=R0201,C0115,C0116,W0212
+import os.path
+import tempfile
+import unittest
+from fractions import Fraction
+
+import imschrm.hrm as hrm
+from imschrm.checkpoint import validate_resumable, load_checkpoint
+from imschrm.result_cache import RecordingEventHandler
+
+from .helpers import make_doc, validate
+
+DOCS = [
+  (0, 3, make_doc(0, "hello", "hello world", "world")),
+  (3, 6, make_doc(3, "", "abc", "abc")),
+  (6, 9, make_doc(6, "world", "abcdefghijklmnopqrstuvwxyz" * 4, "".join(chr(0x4E00 + i) for i in range(200)))),
+  (9.5, 12, make_doc(9, "abc", "abc", "hello"))
+]
+
+class _Interrupted(Exception):
+  pass
+
+class _InterruptingEventHandler(RecordingEventHandler):
+  def __init__(self, max_events):
+    super().__init__(hrm.EventHandler())
+    self.max_events = max_events
+
+  def _interrupt(self):
+    if len(self.events) == self.max_events:
+      raise _Interrupted()
+
+  def error(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: hrm.ISDStatistics):
+    self._interrupt()
+    super().error(msg, doc_index, time_offset, available_time, stats)
+
+  def debug(self, msg: str, doc_index: int, time_offset: Fraction, available_time: Fraction, stats: hrm.ISDStatistics):
+    self._interrupt()
+    super().debug(msg, doc_index, time_offset, available_time, stats)
+
+class CheckpointTests(unittest.TestCase):
+
+  def test_complete(self):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      path = os.path.join(tmp_dir, "checkpoint")
+
+      ev = RecordingEventHandler(hrm.EventHandler())
+      error_count = validate_resumable(iter(DOCS), path, ev, checkpoint_interval=0)
+
+      self.assertEqual(ev.events, validate(iter(DOCS)))
+      self.assertEqual(error_count, sum(1 for e in ev.events if e[0] == "error"))
+      self.assertGreater(error_count, 0)
+      self.assertFalse(os.path.exists(path))
+
+  def test_resume(self):
+    expected = validate(iter(DOCS))
+
+    for max_events in range(len(expected)):
+      with self.subTest(max_events=max_events), tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "checkpoint")
+
+        interrupted = _InterruptingEventHandler(max_events)
+
+        with self.assertRaises(_Interrupted):
+          validate_resumable(iter(DOCS), path, interrupted, checkpoint_interval=0)
+
+        checkpoint = load_checkpoint(path)
+
+        self.assertIsNotNone(checkpoint)
+
+        resumed = RecordingEventHandler(hrm.EventHandler())
+        error_count = validate_resumable(iter(DOCS), path, resumed, checkpoint_interval=0, resume=True)
+
+        # events of the ISD that was interrupted are signalled again
+
+        events = [e for e in interrupted.events if e[2] < checkpoint.isd_index] + resumed.events
+
+        self.assertEqual(events, expected)
+        self.assertEqual(error_count, sum(1 for e in expected if e[0] == "error"))
+        self.assertFalse(os.path.exists(path))
+
+  def test_mismatched_sequence(self):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      path = os.path.join(tmp_dir, "checkpoint")
+
+      with self.assertRaises(_Interrupted):
+        validate_resumable(iter(DOCS), path, _InterruptingEventHandler(len(validate(iter(DOCS))) - 1), checkpoint_interval=0)
+
+      edited_docs = [(begin, end, doc.replace("abc", "xyz")) for begin, end, doc in DOCS]
+
+      with self.assertRaises(RuntimeError):
+        validate_resumable(iter(edited_docs), path, RecordingEventHandler(hrm.EventHandler()), checkpoint_interval=0, resume=True)
+
+  def test_file_documents(self):
+    expected = validate(iter(DOCS))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      path = os.path.join(tmp_dir, "checkpoint")
+
+      doc_paths = [os.path.join(tmp_dir, f"doc{i}.ttml") for i in range(len(DOCS))]
+
+      for doc_path, (_, _, doc) in zip(doc_paths, DOCS):
+        with open(doc_path, "w", encoding="utf-8") as f:
+          f.write(doc)
+
+      def iter_files():
+        for doc_path, (begin, end, _) in zip(doc_paths, DOCS):
+          with open(doc_path, "rb") as f:
+            yield (begin, end, f)
+
+      for modified in (False, True):
+        with self.subTest(modified=modified):
+          interrupted = _InterruptingEventHandler(len(expected) - 1)
+
+          with self.assertRaises(_Interrupted):
+            validate_resumable(iter_files(), path, interrupted, checkpoint_interval=0)
+
+          checkpoint = load_checkpoint(path)
+
+          resumed = RecordingEventHandler(hrm.EventHandler())
+
+          if modified:
+
+            # files are identified by their size and modification time, and are not read ahead of parsing
+
+            os.utime(doc_paths[checkpoint.doc_position], ns=(0, 0))
+
+            with self.assertRaises(RuntimeError):
+              validate_resumable(iter_files(), path, resumed, checkpoint_interval=0, resume=True)
+
+          else:
+            validate_resumable(iter_files(), path, resumed, checkpoint_interval=0, resume=True)
+
+            self.assertEqual([e for e in interrupted.events if e[2] < checkpoint.isd_index] + resumed.events, expected)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -29,10 +29,17 @@ __author__ = "Pierre-Anthony Lemieux <pal@palemieux.com>"
 
 # pylint: disable=R0201,C0115,C0116,W0212
 import unittest
+import contextlib
+import io
+import os.path
+import shutil
+import tempfile
 from fractions import Fraction
 
 from imschrm.doc_sequence import iter_isd
-from imschrm.cli import LocalFileSequence, SingleLocalFile
+from imschrm.cli import LocalFileSequence, SingleLocalFile, _validate_input, _expand_inputs, _validate
+from imschrm.cli import ManifestError, make_argument_parser, run, main
+from imschrm.result_cache import ResultCache
 import imschrm.hrm
 
 class DummyErrorHandler:
@@ -69,6 +76,60 @@ class ValidateTests(unittest.TestCase):
     self.assertEqual(isds[4][0], 5)
     self.assertEqual(isds[5][0], 6)
 
+  def test_local_file_sequence_json_lines(self):
+
+    ds = LocalFileSequence("src/test/resources/ttml/sequence001/manifest.jsonl")
+
+    self.assertIsNone(ds.manifest)
+
+    self.assertSequenceEqual(
+      tuple(ds),
+      tuple(LocalFileSequence("src/test/resources/ttml/sequence001/manifest.json"))
+    )
+
+  def test_local_file_sequence_prefetch(self):
+
+    for prefetch in (1, 4):
+      with self.subTest(prefetch=prefetch):
+        self.assertSequenceEqual(
+          tuple(LocalFileSequence("src/test/resources/ttml/sequence001/manifest.jsonl", prefetch)),
+          tuple(LocalFileSequence("src/test/resources/ttml/sequence001/manifest.json"))
+        )
+
+  def test_local_file_sequence_incomplete_entry(self):
+
+    doc_path = os.path.abspath("src/test/resources/ttml/sequence001/doc001.ttml")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      manifest_path = os.path.join(tmp_dir, "manifest.jsonl")
+
+      # the last entry is only partially written
+
+      with open(manifest_path, "w", encoding="utf-8") as f:
+        f.write(f'{{"begin": 0, "end": 1, "path": "{doc_path}"}}\n{{"begin": 1, "end": nu')
+
+      with self.assertRaisesRegex(ManifestError, "line 2"):
+        tuple(LocalFileSequence(manifest_path))
+
+      with self.assertLogs("hrm-validator", "ERROR"):
+        self.assertEqual(run(make_argument_parser().parse_args(["--itype", "manifest", manifest_path])), 1)
+
+  def test_local_file_sequence_no_entries(self):
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      for filename, contents in (("manifest.jsonl", ""), ("manifest.jsonl", "\n\n"), ("manifest.json", "[]")):
+        with self.subTest(contents=contents):
+          manifest_path = os.path.join(tmp_dir, filename)
+
+          with open(manifest_path, "w", encoding="utf-8") as f:
+            f.write(contents)
+
+          with self.assertRaisesRegex(ManifestError, "no entries"):
+            tuple(LocalFileSequence(manifest_path))
+
+          with self.assertLogs("hrm-validator", "ERROR"):
+            self.assertEqual(run(make_argument_parser().parse_args(["--itype", "manifest", manifest_path])), 1)
+
   def test_fail_1(self):
 
     ev = DummyErrorHandler()
@@ -89,5 +150,134 @@ class ValidateTests(unittest.TestCase):
 
     self.assertSequenceEqual(ev.error_times, (1,))
 
+  def test_validate_input(self):
+
+    failed, messages, _ = _validate_input("src/test/resources/ttml/fail001.ttml", "ttml")
+
+    self.assertTrue(failed)
+    self.assertEqual(len(messages), 1)
+
+    failed, messages, _ = _validate_input("src/test/resources/ttml/sequence001/manifest.json", "manifest")
+
+    self.assertFalse(failed)
+    self.assertEqual(len(messages), 0)
+
+    failed, messages, _ = _validate_input("src/test/resources/ttml/missing.ttml", "ttml")
+
+    self.assertTrue(failed)
+    self.assertEqual(len(messages), 1)
+
+  def test_batch_jobs(self):
+
+    with tempfile.TemporaryDirectory() as input_dir:
+      shutil.copy("src/test/resources/ttml/fail001.ttml", os.path.join(input_dir, "a.ttml"))
+      shutil.copy("src/test/resources/ttml/sequence001/doc001.ttml", os.path.join(input_dir, "b.ttml"))
+
+      stdout = io.StringIO()
+
+      with contextlib.redirect_stdout(stdout), self.assertRaises(SystemExit) as cm:
+        main([input_dir, "--jobs", "2"])
+
+      self.assertEqual(cm.exception.code, 1)
+
+      lines = stdout.getvalue().splitlines()
+
+      self.assertEqual(lines[0], f"{os.path.join(input_dir, 'a.ttml')}: FAIL")
+      self.assertTrue(lines[1].startswith("ERROR: Rendering time exceeded"))
+      self.assertEqual(lines[-2], f"{os.path.join(input_dir, 'b.ttml')}: PASS")
+      self.assertEqual(lines[-1], "1 of 2 inputs failed validation")
+
+      # all inputs pass
+
+      os.remove(os.path.join(input_dir, "a.ttml"))
+      shutil.copy("src/test/resources/ttml/sequence001/doc002.ttml", os.path.join(input_dir, "c.ttml"))
+
+      with contextlib.redirect_stdout(io.StringIO()):
+        self.assertEqual(run(make_argument_parser().parse_args([input_dir, "--jobs", "2"])), 0)
+
+  def test_batch_no_input(self):
+
+    with tempfile.TemporaryDirectory() as input_dir:
+      with self.assertLogs("hrm-validator", "ERROR"):
+        self.assertEqual(run(make_argument_parser().parse_args([input_dir, "--jobs", "2"])), 2)
+
+      with self.assertRaises(ValueError):
+        _expand_inputs(["src/test/resources/ttml/fail001.ttml", input_dir], "ttml")
+
+  def test_result_cache(self):
+
+    for hash_contents in (False, True):
+
+      with tempfile.TemporaryDirectory() as cache_dir:
+
+        for path, itype in (
+          ("src/test/resources/ttml/fail001.ttml", "ttml"),
+          ("src/test/resources/ttml/fail002/manifest.json", "manifest")
+          ):
+
+          with self.subTest(path=path, hash_contents=hash_contents):
+            expected_ev = DummyErrorHandler()
+
+            _validate(path, itype, expected_ev)
+
+            for expected_hits in (0, 1):
+              ev = DummyErrorHandler()
+
+              result_cache = ResultCache(cache_dir, hash_contents)
+
+              _validate(path, itype, ev, result_cache=result_cache)
+
+              self.assertSequenceEqual(ev.error_times, expected_ev.error_times)
+              self.assertEqual(result_cache.hits, expected_hits)
+              self.assertEqual(result_cache.misses, 1 - expected_hits)
+
+    # the key depends on the tolerance and the timing of the documents
+
+    self.assertNotEqual(
+      ResultCache.input_key(LocalFileSequence("src/test/resources/ttml/sequence001/manifest.json"), 0),
+      ResultCache.input_key(LocalFileSequence("src/test/resources/ttml/sequence001/manifest.json"), 0.1)
+    )
+
+    self.assertNotEqual(
+      ResultCache.input_key([(0, 1, b"<tt/>")]),
+      ResultCache.input_key([(0, 2, b"<tt/>")])
+    )
+
+    # by default, the key depends on the modification time of the files of the input
+
+    with tempfile.TemporaryDirectory() as input_dir:
+      path = os.path.join(input_dir, "doc.ttml")
+
+      with open(path, "wb") as f:
+        f.write(b"<tt/>")
+
+      key = ResultCache.file_key([path])
+
+      self.assertEqual(ResultCache.file_key([path]), key)
+
+      os.utime(path, ns=(0, 0))
+
+      self.assertNotEqual(ResultCache.file_key([path]), key)
+
+  def test_expand_inputs(self):
+
+    self.assertSequenceEqual(
+      _expand_inputs(["src/test/resources/ttml/sequence001", "src/test/resources/ttml/fail001.ttml"], "ttml"),
+      (
+        "src/test/resources/ttml/sequence001/doc001.ttml",
+        "src/test/resources/ttml/sequence001/doc002.ttml",
+        "src/test/resources/ttml/fail001.ttml"
+      )
+    )
+
+    self.assertSequenceEqual(
+      _expand_inputs(["src/test/resources/ttml/fail002", "src/test/resources/ttml/sequence001"], "manifest"),
+      (
+        "src/test/resources/ttml/fail002/manifest.json",
+        "src/test/resources/ttml/sequence001/manifest.json",
+        "src/test/resources/ttml/sequence001/manifest.jsonl"
+      )
+    )
+
 if __name__ == '__main__':
   unittest.main()
@@ -29,7 +29,7 @@ __author__ = "Pierre-Anthony Lemieux <pal@palemieux.com>"
 
 import unittest
 
-from imschrm.codepoint_sets import GCPY_12, RENGI_06
+from imschrm.codepoint_sets import GCPY_12, RENGI_06, CodepointSet
 
 class CodepointSets(unittest.TestCase):
 
@@ -52,5 +52,12 @@ class CodepointSets(unittest.TestCase):
 
     self.assertNotIn(ord("*"), RENGI_06) # Common
 
+  def test_codepoint_set(self):
+    s = CodepointSet((2, 4, 7, 8))
+
+    self.assertSequenceEqual([cp for cp in range(10) if cp in s], (2, 3, 7))
+    self.assertSequenceEqual(list(s), (2, 3, 7))
+    self.assertEqual(len(s), 3)
+
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Unit tests for the validation daemon"""
+
+__author__ = "agent <agent@local>"
+
+# pylint: disable=R0201,C0115,C0116,W0212
+import unittest
+import os.path
+import socket
+import stat
+import tempfile
+import threading
+import unittest.mock
+
+import imschrm.daemon
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets are not available")
+class DaemonTests(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.socket_path = os.path.join(self.tmp_dir.name, "imschrm.sock")
+    self.server = imschrm.daemon.Server(self.socket_path)
+    self.server_thread = threading.Thread(target=self.server.serve_forever)
+    self.server_thread.start()
+
+  def tearDown(self):
+    self.server.shutdown()
+    self.server_thread.join()
+    self.server.server_close()
+    self.tmp_dir.cleanup()
+
+  def test_pass(self):
+    response = imschrm.daemon.request(["src/test/resources/ttml/sequence001/doc001.ttml"], self.socket_path)
+
+    self.assertEqual(response["status"], 0)
+    self.assertEqual(response["stdout"], "")
+
+  def test_fail(self):
+    response = imschrm.daemon.request(["src/test/resources/ttml/fail001.ttml"], self.socket_path)
+
+    self.assertEqual(response["status"], 1)
+    self.assertEqual(response["stdout"], "Validation failed\n")
+    self.assertIn("Rendering time exceeded", response["stderr"])
+
+  def test_invalid_arguments(self):
+    response = imschrm.daemon.request(["--itype", "unknown", "doc.ttml"], self.socket_path)
+
+    self.assertEqual(response["status"], 2)
+    self.assertIn("--itype", response["stderr"])
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets are not available")
+class SocketPathTests(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_socket_permissions(self):
+    socket_path = os.path.join(self.tmp_dir.name, "imschrm.sock")
+
+    with imschrm.daemon.Server(socket_path):
+      self.assertTrue(stat.S_ISSOCK(os.lstat(socket_path).st_mode))
+      self.assertEqual(stat.S_IMODE(os.lstat(socket_path).st_mode), 0o600)
+
+    self.assertFalse(os.path.exists(socket_path))
+
+  def test_existing_file_not_removed(self):
+    file_path = os.path.join(self.tmp_dir.name, "imschrm.sock")
+
+    with open(file_path, "w", encoding="utf-8") as f:
+      f.write("not a socket")
+
+    with self.assertRaises(OSError):
+      imschrm.daemon.Server(file_path)
+
+    self.assertTrue(os.path.isfile(file_path))
+
+  def test_default_socket_path(self):
+    with unittest.mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": self.tmp_dir.name}):
+      self.assertEqual(imschrm.daemon.default_socket_path(), os.path.join(self.tmp_dir.name, "imschrm.sock"))
+
+    with unittest.mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": ""}), \
+      unittest.mock.patch("tempfile.gettempdir", return_value=self.tmp_dir.name):
+
+      socket_path = imschrm.daemon.default_socket_path()
+
+      with imschrm.daemon.Server() as server:
+        self.assertEqual(server.server_address, socket_path)
+
+      self.assertEqual(stat.S_IMODE(os.lstat(os.path.dirname(socket_path)).st_mode), 0o700)
+
+      # a directory accessible to other users is rejected
+
+      os.chmod(os.path.dirname(socket_path), 0o755)
+
+      with self.assertRaises(RuntimeError):
+        imschrm.daemon.Server()
+
+if __name__ == '__main__':
+  unittest.main()
@@ -29,8 +29,16 @@ __author__ = "Pierre-Anthony Lemieux <pal@palemieux.com>"
 
 # pylint: disable=R0201,C0115,C0116,W0212
 import unittest
+import io
+import mmap
+import tempfile
+import unittest.mock
+import xml.etree.ElementTree as et
 
-from imschrm.doc_sequence import iter_isd
+import ttconv.imsc.reader
+import ttconv.isd
+
+from imschrm.doc_sequence import iter_isd, ModelCache, ISDCache, region_generations
 
 TTML_DOC_1 = '''<?xml version="1.0" encoding="UTF-8"?>
 <tt xml:lang="en"  xmlns="http://www.w3.org/ns/ttml">
@@ -62,6 +70,42 @@ TTML_DOC_3 = '''<?xml version="1.0" encoding="UTF-8"?>
   </body>
 </tt>'''
 
+TTML_DOC_4 = '''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en" xmlns="http://www.w3.org/ns/ttml" xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <head>
+    <layout>
+      <region xml:id="r1" tts:extent="100% 50%"/>
+      <region xml:id="r2" tts:origin="0% 50%" tts:extent="100% 50%" tts:backgroundColor="black"/>
+    </layout>
+  </head>
+  <body>
+    <div begin="1s">
+      <p region="r1" begin="0s" end="2s">a<span begin="1s">b</span><span end="0.5s">c</span></p>
+      <p region="r2" begin="1s" end="4s">d<set begin="1s" end="2s" tts:color="red"/></p>
+      <p region="r1" begin="3s" end="3s">e</p>
+      <p region="r1">f<span begin="2s" end="5s">g</span></p>
+    </div>
+    <div begin="6s" end="7s">
+      <p region="r2">h</p>
+    </div>
+  </body>
+</tt>'''
+
+def _dump_element(element):
+  return (
+    type(element).__name__,
+    element.get_id(),
+    element.get_text() if isinstance(element, ttconv.model.Text) else None,
+    tuple((prop.__name__, element.get_style(prop)) for prop in element.iter_styles()),
+    tuple(_dump_element(child) for child in element)
+  )
+
+def _pairwise(iterable):
+  return zip(iterable, iterable[1:])
+
+def _dump_isd(isd):
+  return None if isd is None else tuple(_dump_element(region) for region in isd.iter_regions())
+
 class DocumentSequenceTests(unittest.TestCase):
 
   def test_iter_isd_1(self):
@@ -116,5 +160,230 @@ class DocumentSequenceTests(unittest.TestCase):
     self.assertEqual(isds[3][0], 4)
     self.assertEqual(isds[4][0], 5)
 
+  def test_iter_isd_matches_from_model(self):
+
+    isds = tuple(iter_isd([(0, None, TTML_DOC_4)]))
+
+    doc = ttconv.imsc.reader.to_model(et.ElementTree(et.fromstring(TTML_DOC_4)))
+
+    expected_isds = ttconv.isd.ISD.generate_isd_sequence(doc)
+
+    self.assertEqual(len(isds), len(expected_isds))
+
+    for (offset, isd), (expected_offset, expected_isd) in zip(isds, expected_isds):
+      self.assertEqual(offset, expected_offset)
+      self.assertEqual(_dump_isd(isd), _dump_isd(expected_isd))
+
+  def test_iter_isd_window(self):
+
+    isds = tuple(iter_isd([(2.5, 6.5, TTML_DOC_4)]))
+
+    doc = ttconv.imsc.reader.to_model(et.ElementTree(et.fromstring(TTML_DOC_4)))
+
+    self.assertSequenceEqual([offset for offset, _ in isds], (2.5, 3, 5, 6))
+
+    for (offset, isd), expected_offset in zip(isds, (2, 3, 5, 6)):
+      self.assertEqual(_dump_isd(isd), _dump_isd(ttconv.isd.ISD.from_model(doc, expected_offset)))
+
+  def test_iter_isd_parallel(self):
+
+    docs = [
+      (0.5, 3, TTML_DOC_1),
+      (3, 5, TTML_DOC_4),
+      (5, 6, TTML_DOC_3),
+      (7, None, TTML_DOC_2)
+    ]
+
+    isds = tuple(iter_isd(docs))
+
+    parallel_isds = tuple(iter_isd(docs, max_workers=2))
+
+    self.assertSequenceEqual(
+      [(offset, _dump_isd(isd)) for offset, isd in parallel_isds],
+      [(offset, _dump_isd(isd)) for offset, isd in isds]
+    )
+
+  def test_iter_isd_parallel_wide_document(self):
+
+    spans = "".join(f"<span>w{i} </span>" for i in range(600))
+
+    wide_doc = f'''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en" xmlns="http://www.w3.org/ns/ttml">
+  <body>
+    <div>
+      <p begin="0s" end="1s">{spans}</p>
+      <p begin="1s" end="2s">{spans}</p>
+    </div>
+  </body>
+</tt>'''
+
+    docs = [
+      (0, 2, wide_doc),
+      (2, None, TTML_DOC_1)
+    ]
+
+    isds = tuple(iter_isd(docs))
+
+    with self.assertLogs("imschrm.doc_sequence", "WARNING"):
+      parallel_isds = tuple(iter_isd(docs, max_workers=2))
+
+    self.assertSequenceEqual(
+      [(offset, _dump_isd(isd)) for offset, isd in parallel_isds],
+      [(offset, _dump_isd(isd)) for offset, isd in isds]
+    )
+
+  def test_region_generations(self):
+
+    isds = tuple(iter_isd([(0, None, TTML_DOC_4)]))
+
+    for (_, prev_isd), (_, isd) in _pairwise(isds):
+      prev_regions = {region.get_id(): _dump_element(region) for region in prev_isd.iter_regions()}
+
+      for region in isd.iter_regions():
+        if region_generations(isd)[region.get_id()] == region_generations(prev_isd)[region.get_id()]:
+          self.assertEqual(_dump_element(region), prev_regions.get(region.get_id()))
+
+    # r2 is unchanged when a span of r1 ends
+
+    self.assertEqual(region_generations(isds[1][1])["r2"], region_generations(isds[2][1])["r2"])
+    self.assertNotEqual(region_generations(isds[1][1])["r1"], region_generations(isds[2][1])["r1"])
+
+    # generations are unknown for ISDs read from the cache
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+      for _, isd in iter_isd([(0, None, TTML_DOC_4)], isd_cache=ISDCache(cache_dir)):
+        self.assertIsNone(region_generations(isd))
+
+  def test_iter_isd_binary_documents(self):
+
+    expected_isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd([(0, None, TTML_DOC_4)])]
+
+    doc_bytes = TTML_DOC_4.encode("utf-8")
+
+    with tempfile.TemporaryFile() as f:
+      f.write(doc_bytes)
+      f.flush()
+
+      with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_doc:
+        for ttml_doc in (doc_bytes, bytearray(doc_bytes), memoryview(doc_bytes), io.BytesIO(doc_bytes), mapped_doc):
+          with self.subTest(type=type(ttml_doc).__name__):
+            isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd([(0, None, ttml_doc)])]
+            self.assertSequenceEqual(isds, expected_isds)
+
+        isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd([(0, None, mapped_doc)], max_workers=2)]
+        self.assertSequenceEqual(isds, expected_isds)
+
+  def test_iter_isd_streamed_parsing(self):
+
+    for ttml_doc in (TTML_DOC_1, TTML_DOC_4):
+      expected_isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd([(0, None, ttml_doc)])]
+
+      # feed the parser a few characters at a time
+
+      with unittest.mock.patch("imschrm.doc_sequence._FEED_SIZE", 7):
+        for doc in (ttml_doc, ttml_doc.encode("utf-8"), io.BytesIO(ttml_doc.encode("utf-8"))):
+          isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd([(0, None, doc)])]
+          self.assertSequenceEqual(isds, expected_isds)
+
+  def test_iter_isd_streamed_parsing_error(self):
+
+    with unittest.mock.patch("imschrm.doc_sequence._FEED_SIZE", 7):
+      with self.assertRaises(et.ParseError):
+        tuple(iter_isd([(0, None, TTML_DOC_1 + "<p/>")]))
+
+      with self.assertRaises(et.ParseError):
+        tuple(iter_isd([(0, None, TTML_DOC_1[:-10])]))
+
+  def test_iter_isd_model_cache(self):
+
+    docs = [
+      (0, 2.5, TTML_DOC_4),
+      (2.5, 5, TTML_DOC_1),
+      (5, 6.5, TTML_DOC_4),
+      (6.5, None, TTML_DOC_4.encode("utf-8"))
+    ]
+
+    expected_isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs)]
+
+    model_cache = ModelCache(1)
+
+    isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs, model_cache=model_cache)]
+
+    self.assertSequenceEqual(isds, expected_isds)
+    self.assertEqual(model_cache.hits, 1)
+    self.assertEqual(model_cache.misses, 3)
+    self.assertEqual(len(model_cache), 1)
+
+    model_cache = ModelCache(2)
+
+    isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs, model_cache=model_cache)]
+
+    self.assertSequenceEqual(isds, expected_isds)
+    self.assertEqual(model_cache.hits, 2)
+    self.assertEqual(model_cache.misses, 2)
+
+    model_cache = ModelCache(2)
+
+    isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs, max_workers=2, model_cache=model_cache)]
+
+    self.assertSequenceEqual(isds, expected_isds)
+    self.assertEqual(model_cache.hits + model_cache.misses, len(docs))
+
+  def test_iter_isd_isd_cache(self):
+
+    docs = [
+      (0, 2.5, TTML_DOC_4),
+      (2.5, 5, TTML_DOC_1),
+      (5, 6.5, TTML_DOC_4),
+      (6.5, None, TTML_DOC_2)
+    ]
+
+    expected_isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs)]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+
+      isd_cache = ISDCache(cache_dir)
+
+      isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs, isd_cache=isd_cache)]
+
+      self.assertSequenceEqual(isds, expected_isds)
+      self.assertEqual(isd_cache.hits, 1)
+      self.assertEqual(isd_cache.misses, 3)
+
+      # a later run reuses the cached ISDs
+
+      isd_cache = ISDCache(cache_dir)
+
+      isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs, isd_cache=isd_cache)]
+
+      self.assertSequenceEqual(isds, expected_isds)
+      self.assertEqual(isd_cache.hits, 4)
+      self.assertEqual(isd_cache.misses, 0)
+
+      isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs, max_workers=2, isd_cache=isd_cache)]
+
+      self.assertSequenceEqual(isds, expected_isds)
+      self.assertEqual(isd_cache.hits, 8)
+
+      # entries created by other versions are ignored
+
+      isd_cache = ISDCache(cache_dir)
+      isd_cache.versions += b"+other"
+
+      isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs, isd_cache=isd_cache)]
+
+      self.assertSequenceEqual(isds, expected_isds)
+      self.assertEqual(isd_cache.misses, 3)
+
+      # entries created before the sources of imschrm changed are ignored
+
+      with unittest.mock.patch("imschrm.doc_sequence._source_version", return_value="other"):
+        isd_cache = ISDCache(cache_dir)
+
+      isds = [(offset, _dump_isd(isd)) for offset, isd in iter_isd(docs, isd_cache=isd_cache)]
+
+      self.assertSequenceEqual(isds, expected_isds)
+      self.assertEqual(isd_cache.misses, 3)
+
 if __name__ == '__main__':
   unittest.main()
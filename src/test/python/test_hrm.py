@@ -29,6 +29,8 @@ __author__ = "Pierre-Anthony Lemieux <pal@palemieux.com>"
 
 # pylint: disable=R0201,C0115,C0116,W0212
 import unittest
+import unittest.mock
+import pickle
 from fractions import Fraction
 import xml.etree.ElementTree as et
 
@@ -39,6 +41,8 @@ import ttconv.imsc.reader
 import imschrm.doc_sequence as doc_sequence
 import imschrm.hrm as hrm
 
+from .helpers import validate
+
 _BDRAW = 12
 _GCPY_BASE = 12
 _GCPY_OTHER = 3
@@ -414,6 +418,10 @@ class HRMValidator(unittest.TestCase):
 
     self.assertAlmostEqual(stats.ngra_t, 1/15 * 1/15 * 5)
 
+    self.assertEqual(len(hrm_runner.glyph_styles), 2)
+
+    self.assertEqual(len(hrm_runner.back_buffer), 5)
+
   def test_cjk(self):
     ttml_doc = '''<?xml version="1.0" encoding="UTF-8"?>
 <tt xml:lang="en"
@@ -837,5 +845,340 @@ class HRMValidator(unittest.TestCase):
     with self.assertRaises(InvalidError):
       hrm.validate(doc_sequence.iter_isd([(0, None, ttml_doc)]), eh)
 
+  def test_repeated_isd(self):
+    ttml_doc = '''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en"
+    xmlns="http://www.w3.org/ns/ttml"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <head>
+    <layout>
+      <region xml:id="r1" tts:extent="100% 100%"/>
+    </layout>
+  </head>
+  <body region="r1">
+    <div>
+      <p begin="0s" end="10s">
+        <span>hello</span>
+      </p>
+    </div>
+  </body>
+</tt>'''
+
+    # the same ISD is carried across document boundaries
+
+    isds = tuple(doc_sequence.iter_isd([(0, 1, ttml_doc), (1, 2, ttml_doc), (2, None, ttml_doc)]))
+
+    self.assertEqual(len(isds), 4)
+
+    hrm_runner = hrm.HRM()
+
+    stats = hrm_runner.next_isd(isds[0][1])
+
+    self.assertFalse(stats.is_repeated)
+
+    self.assertEqual(stats.gren_count, 4)
+
+    for _, isd in isds[1:3]:
+      stats = hrm_runner.next_isd(isd)
+
+      self.assertTrue(stats.is_repeated)
+
+      self.assertEqual(stats.gren_count, 0)
+
+      self.assertEqual(stats.gcpy_count, 5)
+
+      self.assertAlmostEqual(stats.dur, 1 / _BDRAW + 1/15 * 1/15 * (5 / _GCPY_BASE))
+
+      self.assertAlmostEqual(stats.ngra_t, 1/15 * 1/15 * 4)
+
+    self.assertTrue(hrm_runner.next_isd(isds[3][1]).is_empty)
+
+    self.assertEqual(hrm_runner.fingerprint_hits, 2)
+
+    self.assertEqual(hrm_runner.fingerprint_misses, 1)
+
+  def test_unchanged_region(self):
+    ttml_doc = '''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en"
+    xmlns="http://www.w3.org/ns/ttml"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <head>
+    <layout>
+      <region xml:id="r1" tts:extent="100% 50%"/>
+      <region xml:id="r2" tts:origin="0% 50%" tts:extent="100% 50%"/>
+    </layout>
+  </head>
+  <body>
+    <div>
+      <p region="r1" begin="0s" end="2s">hello</p>
+      <p region="r2" begin="0s" end="1s">abc</p>
+      <p region="r2" begin="1s" end="2s">bonjour</p>
+    </div>
+  </body>
+</tt>'''
+
+    isds = tuple(doc_sequence.iter_isd([(0, None, ttml_doc)]))
+
+    hrm_runner = hrm.HRM()
+
+    hrm_runner.next_isd(isds[0][1])
+
+    self.assertEqual(hrm_runner.region_misses, 2)
+
+    stats = hrm_runner.next_isd(isds[1][1])
+
+    self.assertEqual(hrm_runner.region_hits, 1)
+
+    self.assertEqual(hrm_runner.region_misses, 3)
+
+    self.assertFalse(stats.is_repeated)
+
+    self.assertEqual(stats.gren_count, 4)
+
+    self.assertEqual(stats.gcpy_count, 8)
+
+    self.assertAlmostEqual(stats.ngra_t, 1/15 * 1/15 * 9)
+
+  def test_stats_match_per_glyph_sum(self):
+    texts = ("hello world, hello again", "the quick brown fox jumps over the lazy dog")
+
+    ttml_doc = f'''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en"
+    xmlns="http://www.w3.org/ns/ttml"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <body>
+    <div>
+      <p begin="0s" end="1s">{texts[0]}</p>
+      <p begin="1s" end="2s">{texts[1]}</p>
+    </div>
+  </body>
+</tt>'''
+
+    isds = tuple(doc_sequence.iter_isd([(0, None, ttml_doc)]))
+
+    hrm_runner = hrm.HRM()
+
+    back_buffer = set()
+
+    for (_, isd), text in zip(isds, texts):
+
+      # the durations of the glyphs are summed one at a time, in document order, so that the results are
+      # bit-identical to a per-glyph evaluation of the model
+
+      nrga = (100 / 15) * (100 / 15) / 10000
+
+      front_buffer = set()
+
+      dur_t = 0
+
+      for char in text:
+        if char in front_buffer or char in back_buffer:
+          dur_t += nrga / hrm._compute_gcpy(char)
+        else:
+          dur_t += nrga / hrm._compute_ren_g(char)
+        front_buffer.add(char)
+
+      back_buffer = front_buffer
+
+      stats = hrm_runner.next_isd(isd)
+
+      self.assertEqual(stats.dur_t, dur_t)
+
+      self.assertEqual(stats.dur, dur_t + 1 / _BDRAW)
+
+  def test_stats_region_backgrounds(self):
+    ttml_doc = '''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en"
+    xmlns="http://www.w3.org/ns/ttml"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <head>
+    <layout>
+      <region xml:id="r1" tts:extent="30% 10%" tts:backgroundColor="black"/>
+      <region xml:id="r2" tts:origin="0% 50%" tts:extent="70% 30%"/>
+    </layout>
+  </head>
+  <body>
+    <div>
+      <p region="r1" begin="0s" end="1s" tts:backgroundColor="red">hello</p>
+      <p region="r2" begin="0s" end="1s">
+        <span tts:backgroundColor="blue">abc</span><span tts:backgroundColor="#00000000">def</span>
+      </p>
+    </div>
+  </body>
+</tt>'''
+
+    _, isd = next(doc_sequence.iter_isd([(0, None, ttml_doc)]))
+
+    stats = hrm.HRM().next_isd(isd)
+
+    self.assertEqual(stats.nbg_total, 3)
+
+    # the area of each region is weighted by its number of backgrounds, and summed in document order before
+    # the root container
+
+    draw_area = 0
+    draw_area += 0.3 * 0.1 * 2
+    draw_area += 0.7 * 0.3 * 1
+    draw_area += 1
+
+    self.assertTrue(stats.clear)
+
+    self.assertEqual(stats.dur_d, draw_area / _BDRAW)
+
+    self.assertEqual(stats.dur, stats.dur_t + stats.dur_d)
+
+  def test_stats_fixtures(self):
+    # statistics computed by the per-glyph evaluation of the model
+
+    expected = {
+      "fail001.ttml": (
+        ("0x1.6480f2b9d6481p-4", 1, 0),
+        ("0x1.240795ceb2408p-3", 16, 0),
+        ("0x0.0p+0", 0, 0)
+      ),
+      "sequence001/doc001.ttml": (
+        ("0x1.82d82d82d82d8p-4", 3, 0),
+        ("0x1.6789abcdf0123p-4", 1, 2),
+        ("0x0.0p+0", 0, 0),
+        ("0x1.7530eca8641fep-4", 2, 1),
+        ("0x0.0p+0", 0, 0)
+      ),
+    }
+
+    for name, isd_stats in expected.items():
+      with self.subTest(name=name):
+        with open(f"src/test/resources/ttml/{name}", "rb") as ttml_file:
+          ttml_doc = ttml_file.read()
+
+        hrm_runner = hrm.HRM()
+
+        stats = tuple(
+          (float(s.dur).hex(), s.gren_count, s.gcpy_count)
+          for s in map(hrm_runner.next_isd, (isd for _, isd in doc_sequence.iter_isd([(0, None, ttml_doc)])))
+          )
+
+        self.assertSequenceEqual(stats, isd_stats)
+
+  def test_unchanged_region_not_walked(self):
+    ttml_doc = '''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en"
+    xmlns="http://www.w3.org/ns/ttml"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <head>
+    <layout>
+      <region xml:id="r1" tts:extent="100% 50%"/>
+      <region xml:id="r2" tts:origin="0% 50%" tts:extent="100% 50%"/>
+    </layout>
+  </head>
+  <body>
+    <div>
+      <p region="r1" begin="0s" end="3s">hello</p>
+      <p region="r2" begin="0s" end="1s">abc</p>
+      <p region="r2" begin="1s" end="2s">bonjour</p>
+      <p region="r2" begin="2s" end="3s">bonjour<span begin="0.5s" tts:display="none">hidden</span></p>
+    </div>
+  </body>
+</tt>'''
+
+    isds = tuple(doc_sequence.iter_isd([(0, None, ttml_doc)]))
+
+    hrm_runner = hrm.HRM()
+
+    with unittest.mock.patch.object(hrm, "_region_fingerprint", wraps=hrm._region_fingerprint) as region_fingerprint:
+      stats = [hrm_runner.next_isd(isd) for _, isd in isds]
+
+    # r1 is only walked once, and r2 each time it changes
+
+    self.assertEqual(region_fingerprint.call_count, 5)
+
+    # the glyphs of r1 are reused without hashing its fingerprint again
+
+    self.assertEqual(hrm_runner.region_hits, 1)
+    self.assertEqual(hrm_runner.region_misses, 3)
+
+    region_fingerprint = hrm_runner.fingerprint[0]
+
+    self.assertEqual(vars(region_fingerprint)["_hash"], hash(tuple(region_fingerprint)))
+
+    # the hash is computed again by other processes
+
+    self.assertNotIn("_hash", vars(pickle.loads(pickle.dumps(region_fingerprint))))
+
+    # the ISDs at 2s and 2.5s are identical to the previous ones, although r2 changed
+
+    self.assertSequenceEqual([s.is_repeated for s in stats], [False, False, True, True, False])
+
+    # regions are walked once per ISD without region generations
+
+    with unittest.mock.patch.object(hrm, "_region_fingerprint", wraps=hrm._region_fingerprint) as region_fingerprint:
+      hrm_runner = hrm.HRM()
+      cached_stats = [hrm_runner.next_isd(pickle.loads(pickle.dumps(isd))) for _, isd in isds]
+
+    self.assertEqual(region_fingerprint.call_count, 8)
+    self.assertEqual(cached_stats, stats)
+
+  def test_parallel_validation(self):
+    ttml_doc = '''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en"
+    xmlns="http://www.w3.org/ns/ttml"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <head>
+    <layout>
+      <region xml:id="r1" tts:extent="50% 50%" tts:backgroundColor="black"/>
+    </layout>
+  </head>
+  <body region="r1">
+    <div>
+      <p begin="0s" end="0.5s">hello</p>
+      <p begin="1s" end="1.1s">bonjour</p>
+      <p begin="1.1s" end="1.2s" tts:fontSize="300%">abcdefghijklmnopqrstuvwxy</p>
+      <p begin="2s" end="3s">hello bonjour</p>
+    </div>
+  </body>
+</tt>'''
+
+    serial_events = validate([(0, None, ttml_doc)])
+
+    self.assertEqual(len(serial_events), 10)
+    self.assertIn("error", (e[0] for e in serial_events))
+    self.assertSequenceEqual(validate([(0, None, ttml_doc)], max_workers=2), serial_events)
+
+    # ISDs that span several tasks
+
+    with unittest.mock.patch.object(hrm, "_PARALLEL_CHUNK_SIZE", 3):
+      self.assertSequenceEqual(validate([(0, None, ttml_doc)], max_workers=2), serial_events)
+
+  def test_parallel_validation_wide_isd(self):
+    spans = "".join(f'<span tts:color="{"red" if i % 2 else "blue"}">w{i} </span>' for i in range(600))
+
+    ttml_doc = f'''<?xml version="1.0" encoding="UTF-8"?>
+<tt xml:lang="en"
+    xmlns="http://www.w3.org/ns/ttml"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling">
+  <body>
+    <div>
+      <p begin="0s" end="1s">{spans}</p>
+      <p begin="1s" end="2s">{spans}</p>
+    </div>
+  </body>
+</tt>'''
+
+    serial_events = validate([(0, None, ttml_doc)])
+
+    self.assertIn("error", (e[0] for e in serial_events))
+    self.assertSequenceEqual(validate([(0, None, ttml_doc)], max_workers=2), serial_events)
+
+  @unittest.skipIf(hrm.numpy is None, "numpy is not available")
+  def test_vectorized_divisors(self):
+    codepoints = [ord(c) for c in "*a͵҂א々ァぁㄅᄀԲ"] + list(range(0, 0x110000, 997))
+
+    self.assertSequenceEqual(
+      hrm._compute_divisors(codepoints),
+      (
+        [hrm._compute_gcpy(chr(codepoint)) for codepoint in codepoints],
+        [hrm._compute_ren_g(chr(codepoint)) for codepoint in codepoints]
+      )
+    )
+
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Unit tests for incremental validation"""
+
+__author__ = "agent <agent@local>"
+
+# pylint: disable=R0201,C0115,C0116,W0212
+import os.path
+import tempfile
+import unittest
+import unittest.mock
+
+import imschrm.doc_sequence
+import imschrm.hrm as hrm
+from imschrm.incremental import validate_incremental, ValidationRecord
+from imschrm.result_cache import RecordingEventHandler
+
+from .helpers import make_doc, validate
+
+DOCS = [
+  (0, 3, make_doc(0, "hello", "hello world", "world")),
+  (3, 6, make_doc(3, "", "abc", "abc")),
+  (6, 9, make_doc(6, "world", "abcdefghijklmnopqrstuvwxyz" * 4, "")),
+  (9.5, 12, make_doc(9, "abc", "abc", "hello"))
+]
+
+class IncrementalTests(unittest.TestCase):
+
+  def _validate_incremental(self, docs, previous):
+    ev = RecordingEventHandler(hrm.EventHandler())
+
+    with unittest.mock.patch(
+      "imschrm.doc_sequence._iter_doc_isd",
+      wraps=imschrm.doc_sequence._iter_doc_isd
+      ) as iter_doc_isd:
+      record = validate_incremental(docs, previous, ev)
+
+    return ev.events, record, iter_doc_isd.call_count
+
+  def test_unchanged(self):
+
+    events, record, processed_count = self._validate_incremental(DOCS, None)
+
+    self.assertSequenceEqual(events, validate(DOCS))
+    self.assertEqual(processed_count, len(DOCS))
+
+    events, _, processed_count = self._validate_incremental(DOCS, record)
+
+    self.assertSequenceEqual(events, validate(DOCS))
+    self.assertEqual(processed_count, 0)
+
+  def test_edited(self):
+
+    _, record, _ = self._validate_incremental(DOCS, None)
+
+    # the edited document is processed, as is the document that follows it unless the state of the HRM that
+    # precedes the latter is unchanged
+
+    for i, texts, expected_processed_count in (
+      (0, ("hello", "hello", "hello"), 2),
+      (1, ("", "", "abc"), 1),
+      (2, ("x" * 200, "y", ""), 2)
+      ):
+
+      with self.subTest(i=i):
+        docs = list(DOCS)
+        docs[i] = (docs[i][0], docs[i][1], make_doc(3 * i, *texts))
+
+        events, _, processed_count = self._validate_incremental(docs, record)
+
+        self.assertSequenceEqual(events, validate(docs))
+        self.assertEqual(processed_count, expected_processed_count)
+
+  def test_save_load(self):
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+      record_path = os.path.join(tmp_dir, "record")
+
+      self.assertIsNone(ValidationRecord.load(record_path))
+
+      _, record, _ = self._validate_incremental(DOCS, None)
+
+      record.save(record_path)
+
+      self.assertIsNone(ValidationRecord.load(record_path, 0.1))
+
+      events, _, processed_count = self._validate_incremental(DOCS, ValidationRecord.load(record_path))
+
+      self.assertSequenceEqual(events, validate(DOCS))
+      self.assertEqual(processed_count, 0)
+
+if __name__ == '__main__':
+  unittest.main()
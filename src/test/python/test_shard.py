@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Copyright (c) 2026, agent
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Unit tests for sharded validation and the serialization of the HRM state"""
+
+__author__ = "agent <agent@local>"
+
+# pylint: disable=R0201,C0115,C0116,W0212
+import concurrent.futures
+import multiprocessing
+import unittest
+import unittest.mock
+
+import imschrm.doc_sequence
+import imschrm.hrm as hrm
+from imschrm.result_cache import RecordingEventHandler
+from imschrm.shard import make_shards, merge_shard_results, next_shard, validate_shard, validate_time_sharded
+from imschrm.state import HRMState
+
+from .helpers import make_doc, validate
+
+DOCS = [
+  (0, 3, make_doc(0, "hello", "hello world", "world")),
+  (3, 6, make_doc(3, "", "abc", "abc")),
+  (6, 9, make_doc(6, "", "", "")),
+  (9, 12, make_doc(9, "", "", "")),
+  (12, 15, make_doc(12, "world", "abcdefghijklmnopqrstuvwxyz" * 4, "".join(chr(0x4E00 + i) for i in range(200)))),
+  (15.5, 18, make_doc(15, "abc", "abc", "hello")),
+  (18, 21, make_doc(18, "hello", "", ""))
+]
+
+def _merge(results):
+  ev = RecordingEventHandler(hrm.EventHandler())
+  merge_shard_results(results, ev)
+  return ev.events
+
+class HRMStateTests(unittest.TestCase):
+
+  def test_round_trip(self):
+    h = hrm.HRM()
+
+    for time_offset, isd in imschrm.doc_sequence.iter_isd(iter(DOCS)):
+      if not h.next_isd(isd).is_empty:
+        state = HRMState.from_hrm(h, time_offset)
+
+        self.assertEqual(HRMState.from_bytes(state.to_bytes()), state)
+
+        restored = state.to_hrm()
+
+        self.assertEqual(restored.back_buffer, h.back_buffer)
+        self.assertEqual(restored.fingerprint, h.fingerprint)
+
+    self.assertEqual(HRMState.from_bytes(HRMState().to_bytes()), HRMState())
+
+  def test_invalid(self):
+    data = HRMState(((0.5, 1, ()),), 2).to_bytes()
+
+    for invalid_data in (b"", b"ABCD\x01", data[:4] + b"\x02" + data[5:], data[:-1], data + b"\x00"):
+      with self.subTest(data=invalid_data), self.assertRaises(ValueError):
+        HRMState.from_bytes(invalid_data)
+
+class ShardTests(unittest.TestCase):
+
+  def test_make_shards(self):
+    shards = make_shards(DOCS, 3)
+
+    self.assertEqual([(s.begin, s.end) for s in shards], [(0, 2), (2, 4), (4, 7)])
+
+    self.assertIsNone(shards[0].start_state)
+    self.assertIsNone(shards[0].prev_end_time)
+
+    # the last non-empty ISD that precedes the third shard is in the second document
+
+    self.assertEqual(HRMState.from_bytes(shards[2].start_state).last_render_time, 5)
+    self.assertEqual(shards[2].prev_end_time, 12)
+
+    self.assertEqual(len(make_shards(DOCS[:2], 3)), 2)
+
+  def test_merge(self):
+    expected = validate(iter(DOCS))
+
+    for shard_count in range(1, len(DOCS) + 1):
+      with self.subTest(shard_count=shard_count):
+        results = [validate_shard(iter(DOCS[shard.begin:shard.end]), shard) for shard in make_shards(DOCS, shard_count)]
+
+        self.assertEqual(_merge(results), expected)
+
+  def test_chain(self):
+    expected = validate(iter(DOCS))
+
+    for shard_count in range(1, len(DOCS) + 1):
+      with self.subTest(shard_count=shard_count):
+        results = []
+
+        for shard in make_shards(DOCS, shard_count):
+          if results:
+            shard = next_shard(results[-1], shard.begin, shard.end)
+
+          results.append(validate_shard(iter(DOCS[shard.begin:shard.end]), shard))
+
+        self.assertEqual(_merge(results), expected)
+
+  def test_processes(self):
+    shards = make_shards(DOCS, 4)
+
+    with concurrent.futures.ProcessPoolExecutor(2) as executor:
+      results = list(executor.map(validate_shard, [DOCS[shard.begin:shard.end] for shard in shards], shards))
+
+    self.assertEqual(_merge(results), validate(iter(DOCS)))
+
+  def test_discontinuity(self):
+    results = [validate_shard(iter(DOCS[shard.begin:shard.end]), shard) for shard in make_shards(DOCS, 4)]
+
+    with self.assertRaises(RuntimeError):
+      _merge([results[0], results[2]])
+
+    with self.assertRaises(RuntimeError):
+      _merge(results[1:])
+
+class TimeShardTests(unittest.TestCase):
+
+  def test_time_shards(self):
+    doc = make_doc(0, "hello", "", "world", "abc", "abcdefghijklmnopqrstuvwxyz" * 4, "", "", "abc", "hello world")
+
+    for doc_begin, doc_end in ((0, None), (0, 9), (1.5, 7)):
+
+      expected = validate(iter([(doc_begin, doc_end, doc)]))
+
+      for shard_count in (1, 2, 4, 12):
+        with self.subTest(doc_begin=doc_begin, doc_end=doc_end, shard_count=shard_count):
+          ev = RecordingEventHandler(hrm.EventHandler())
+          validate_time_sharded(doc.encode("utf-8"), ev, 0, shard_count, doc_begin, doc_end)
+
+          self.assertEqual(ev.events, expected)
+
+  def test_time_shards_parse_once(self):
+    doc = make_doc(0, "hello", "world", "abc", "hello world")
+
+    expected = validate(iter([(0, None, doc)]))
+
+    with unittest.mock.patch.object(
+      imschrm.doc_sequence,
+      "_to_model",
+      wraps=imschrm.doc_sequence._to_model
+    ) as to_model:
+      ev = RecordingEventHandler(hrm.EventHandler())
+      validate_time_sharded(doc.encode("utf-8"), ev, 0, 2)
+
+    self.assertEqual(ev.events, expected)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+      self.assertEqual(to_model.call_count, 1)
+
+    # the worker processes parse the document if they cannot be forked
+
+    with unittest.mock.patch.object(multiprocessing, "get_all_start_methods", return_value=["spawn"]):
+      ev = RecordingEventHandler(hrm.EventHandler())
+      validate_time_sharded(doc.encode("utf-8"), ev, 0, 2)
+
+    self.assertEqual(ev.events, expected)
+
+if __name__ == '__main__':
+  unittest.main()